@@ -0,0 +1,1215 @@
+# ======================================================================
+# >> IMPORTS
+# ======================================================================
+
+# Hero-Wars
+from hw.configs import database_path
+from hw.configs import database_profiles
+from hw.configs import database_profile
+from hw.configs import database_server
+from hw.configs import database_pool_size
+from hw.configs import packed_skills
+
+# Python
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+# PyMySQL is only required by the mysql backend
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+
+# ======================================================================
+# >> ALL DECLARATION
+# ======================================================================
+
+__all__ = (
+    'Statements',
+    'ConnectionPool',
+    'Backend',
+    'SQLiteBackend',
+    'MySQLBackend',
+    'backend_classes',
+    'skill_layout_id',
+    'pack_skill_levels',
+    'unpack_skill_levels'
+)
+
+
+# ======================================================================
+# >> CLASSES
+# ======================================================================
+
+class Statements(object):
+    """Executes statements on a connection, reusing their cursors.
+
+    Each distinct SQL statement gets its own cursor which is kept for
+    the lifetime of the Statements object, so executing the same
+    statement again doesn't create a new cursor.
+    Works with any DB-API 2.0 connection.
+
+    Attributes:
+        connection: Connection the statements are executed on
+    """
+
+    def __init__(self, connection):
+        """Initializes a new statement layer for a connection.
+
+        Args:
+            connection: Connection to execute the statements on
+        """
+
+        self.connection = connection
+        self._cursors = {}
+
+    def _cursor(self, sql):
+        """Gets the cursor reserved for an SQL statement."""
+
+        cursor = self._cursors.get(sql)
+        if cursor is None:
+            cursor = self._cursors[sql] = self.connection.cursor()
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        """Executes an SQL statement.
+
+        Args:
+            sql: SQL statement to execute
+            parameters: Parameters of the statement
+
+        Returns:
+            The cursor used to execute the statement
+        """
+
+        cursor = self._cursor(sql)
+        cursor.execute(sql, parameters)
+        return cursor
+
+    def executemany(self, sql, seq_of_parameters):
+        """Executes an SQL statement for each set of parameters.
+
+        Args:
+            sql: SQL statement to execute
+            seq_of_parameters: Iterable of the parameters
+
+        Returns:
+            The cursor used to execute the statement
+        """
+
+        cursor = self._cursor(sql)
+        cursor.executemany(sql, seq_of_parameters)
+        return cursor
+
+    def fetchone(self, sql, parameters=()):
+        """Executes a query and fetches the first row."""
+
+        return self.execute(sql, parameters).fetchone()
+
+    def fetchall(self, sql, parameters=()):
+        """Executes a query and fetches all the rows."""
+
+        return self.execute(sql, parameters).fetchall()
+
+    def close(self):
+        """Closes all the cursors and the connection."""
+
+        for cursor in self._cursors.values():
+            cursor.close()
+        self._cursors.clear()
+        self.connection.close()
+
+
+class ConnectionPool(object):
+    """A bounded pool of connections wrapped into Statements objects.
+
+    At most size connections are in use at once, further requests
+    block until a connection is returned to the pool. Connections are
+    opened lazily, and a connection which raised an error while in use
+    is closed instead of being returned.
+    """
+
+    def __init__(self, connect, size):
+        """Initializes a new connection pool.
+
+        Args:
+            connect: Function which opens a new connection
+            size: Maximum amount of connections
+        """
+
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def statements(self):
+        """Borrows a connection from the pool for a with block.
+
+        Yields:
+            Statements object of the borrowed connection
+        """
+
+        with self._slots:
+            try:
+                statements = self._idle.get_nowait()
+            except queue.Empty:
+                statements = Statements(self._connect())
+            try:
+                yield statements
+            except Exception:
+                statements.close()
+                raise
+            self._idle.put(statements)
+
+    def close(self):
+        """Closes all the idle connections."""
+
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class Backend(object):
+    """Base class for Hero-Wars's storage backends.
+
+    A backend stores the players, heroes and skills tables and the
+    reward journal, and executes hw.database's queries. The statements
+    are written in SQLite's dialect, subclasses translate them with
+    _sql().
+    The fetch methods must be safe to call from multiple threads at
+    once; the write methods are only called by one thread at a time.
+
+    Attributes:
+        packed: Are skill levels packed into the heroes table
+
+    Class Attributes:
+        errors: Tuple of exception classes raised by the backend
+    """
+
+    errors = ()
+    packed = False
+
+    _CREATE_TABLES = ()
+
+    _ADD_COLUMNS = (
+        ('heroes', 'skills', 'BLOB'),
+        ('players', 'last_seen', 'INTEGER'),
+        ('players', 'name', 'TEXT')
+    )
+
+    # Indexes for the leaderboards, the heroes index covers the query
+    _ADD_INDEXES = (
+        ('heroes', 'heroes_rank', 'cid, level, exp, steamid'),
+        ('players', 'players_gold', 'gold')
+    )
+
+    _INSERT_PLAYER = (
+        "INSERT OR REPLACE INTO players "
+        "(steamid, gold, hero_cid, last_seen, name) VALUES (?, ?, ?, ?, ?)")
+    _INSERT_HERO = (
+        "INSERT OR REPLACE INTO heroes (steamid, cid, level, exp) "
+        "VALUES (?, ?, ?, ?)")
+    _INSERT_PACKED_HERO = (
+        "INSERT OR REPLACE INTO heroes (steamid, cid, level, exp, skills) "
+        "VALUES (?, ?, ?, ?, ?)")
+    _INSERT_SKILL = (
+        "INSERT OR REPLACE INTO skills (steamid, hero_cid, cid, level) "
+        "VALUES (?, ?, ?, ?)")
+    _SELECT_PLAYER = "SELECT gold, hero_cid FROM players WHERE steamid=?"
+    _SELECT_HEROES = (
+        "SELECT cid, level, exp, NULL FROM heroes WHERE steamid=?")
+    _SELECT_PACKED_HEROES = (
+        "SELECT cid, level, exp, skills FROM heroes WHERE steamid=?")
+    _SELECT_SKILLS = "SELECT hero_cid, cid, level FROM skills WHERE steamid=?"
+    _SELECT_SKILL_STEAMIDS = (
+        "SELECT DISTINCT steamid FROM skills WHERE steamid > ? "
+        "ORDER BY steamid LIMIT ?")
+    _SELECT_SKILLS_IN = (
+        "SELECT steamid, hero_cid, cid, level FROM skills "
+        "WHERE steamid IN ({0})")
+    _INSERT_JOURNAL = (
+        "INSERT INTO journal (steamid, hero_cid, seq, exp, gold) "
+        "VALUES (?, ?, ?, ?, ?)")
+    _TRIM_JOURNAL = (
+        "DELETE FROM journal WHERE steamid=? AND hero_cid=? AND seq<=?")
+    _SELECT_JOURNAL_SEQ = "SELECT MAX(seq) FROM journal"
+    _SELECT_JOURNAL_ID = "SELECT MAX(id) FROM journal"
+    _SELECT_JOURNAL_SUMS = (
+        "SELECT steamid, hero_cid, SUM(exp), SUM(gold) FROM journal "
+        "WHERE id<=? GROUP BY steamid, hero_cid")
+    _DELETE_JOURNAL = "DELETE FROM journal WHERE id<=?"
+    _INSERT_MISSING_PLAYER = (
+        "INSERT OR IGNORE INTO players (steamid, gold, hero_cid) "
+        "VALUES (?, 0, NULL)")
+    _INSERT_MISSING_HERO = (
+        "INSERT OR IGNORE INTO heroes (steamid, cid, level, exp) "
+        "VALUES (?, ?, 0, 0)")
+    _ADD_PLAYER_GOLD = "UPDATE players SET gold=gold+? WHERE steamid=?"
+    _ADD_HERO_EXP = "UPDATE heroes SET exp=exp+? WHERE steamid=? AND cid=?"
+    _SELECT_PLAYERS_AFTER = (
+        "SELECT steamid, gold, hero_cid, last_seen, name FROM players "
+        "WHERE steamid > ? ORDER BY steamid LIMIT ?")
+    _SELECT_HEROES_AFTER = (
+        "SELECT steamid, cid, level, exp, NULL FROM heroes "
+        "WHERE steamid > ? OR (steamid = ? AND cid > ?) "
+        "ORDER BY steamid, cid LIMIT ?")
+    _SELECT_PACKED_HEROES_AFTER = (
+        "SELECT steamid, cid, level, exp, skills FROM heroes "
+        "WHERE steamid > ? OR (steamid = ? AND cid > ?) "
+        "ORDER BY steamid, cid LIMIT ?")
+    _SELECT_SKILLS_AFTER = (
+        "SELECT steamid, hero_cid, cid, level FROM skills "
+        "WHERE steamid > ? OR (steamid = ? AND ("
+        "hero_cid > ? OR (hero_cid = ? AND cid > ?))) "
+        "ORDER BY steamid, hero_cid, cid LIMIT ?")
+    _UPDATE_PACKED_SKILLS = (
+        "UPDATE heroes SET skills=? WHERE steamid=? AND cid=?")
+    _DELETE_HERO_SKILLS = "DELETE FROM skills WHERE steamid=? AND hero_cid=?"
+    _INSERT_SKILL_LAYOUT = (
+        "INSERT OR IGNORE INTO skill_layouts (id, cids) VALUES (?, ?)")
+    _SELECT_SKILL_LAYOUTS = "SELECT id, cids FROM skill_layouts"
+    _SET_LAST_SEEN = "UPDATE players SET last_seen=? WHERE last_seen IS NULL"
+    _ANALYZE = "ANALYZE {0}"
+    _SELECT_TOP_PLAYERS = (
+        "SELECT steamid, name, gold FROM players "
+        "ORDER BY gold DESC LIMIT ?")
+    _SELECT_TOP_HEROES = (
+        "SELECT heroes.steamid, players.name, heroes.level, heroes.exp "
+        "FROM heroes LEFT JOIN players ON players.steamid = heroes.steamid "
+        "WHERE heroes.cid = ? "
+        "ORDER BY heroes.level DESC, heroes.exp DESC LIMIT ?")
+
+    def _sql(self, sql):
+        """Translates a statement into the backend's SQL dialect.
+
+        Args:
+            sql: Statement in SQLite's dialect
+
+        Returns:
+            The translated statement
+        """
+
+        return sql
+
+    @contextmanager
+    def _read(self):
+        """Provides a Statements object for reading.
+
+        Yields:
+            Statements object to execute the queries with
+        """
+
+        raise NotImplementedError
+
+    @contextmanager
+    def _write(self):
+        """Provides a Statements object for writing in a transaction.
+
+        The transaction is committed at the end of the with block, or
+        rolled back if the block raises an exception.
+
+        Yields:
+            Statements object to execute the statements with
+        """
+
+        raise NotImplementedError
+
+    def _has_column(self, statements, table, column):
+        """Checks if a table has a column.
+
+        Args:
+            statements: Statements object to execute the query with
+            table: Name of the table
+            column: Name of the column
+
+        Returns:
+            True if the column exists
+        """
+
+        raise NotImplementedError
+
+    def _has_index(self, statements, table, index):
+        """Checks if a table has an index.
+
+        Args:
+            statements: Statements object to execute the query with
+            table: Name of the table
+            index: Name of the index
+
+        Returns:
+            True if the index exists
+        """
+
+        raise NotImplementedError
+
+    def setup(self):
+        """Opens the backend and creates the tables.
+
+        Also adds the columns and indexes missing from a database
+        created by an older version of Hero-Wars. Existing players get
+        the current time as their last_seen.
+        """
+
+        with self._write() as statements:
+            for sql in self._CREATE_TABLES:
+                statements.execute(self._sql(sql))
+            for table, column, column_type in self._ADD_COLUMNS:
+                if not self._has_column(statements, table, column):
+                    statements.execute(self._sql(
+                        'ALTER TABLE {0} ADD COLUMN {1} {2}'.format(
+                            table, column, column_type)))
+            for table, index, columns in self._ADD_INDEXES:
+                if not self._has_index(statements, table, index):
+                    statements.execute(self._sql(
+                        'CREATE INDEX {0} ON {1} ({2})'.format(
+                            index, table, columns)))
+            statements.execute(
+                self._sql(self._SET_LAST_SEEN), (int(time.time()), ))
+
+    def close(self):
+        """Closes all of the backend's connections."""
+
+        raise NotImplementedError
+
+    def fetch_player_rows(self, steamid):
+        """Fetches all of player's rows.
+
+        Args:
+            steamid: Steamid of the player
+
+        Returns:
+            A tuple of player's (gold, hero_cid) row or None,
+            his (cid, level, exp, packed_skills) hero rows and
+            the (hero_cid, cid, level) skill rows of all his heroes.
+            In packed mode there are no skill rows, otherwise the
+            packed skills are None.
+        """
+
+        with self._read() as statements:
+            player_row = statements.fetchone(
+                self._sql(self._SELECT_PLAYER), (steamid, ))
+            if self.packed:
+                return player_row, statements.fetchall(
+                    self._sql(self._SELECT_PACKED_HEROES), (steamid, )), []
+            return (
+                player_row,
+                statements.fetchall(
+                    self._sql(self._SELECT_HEROES), (steamid, )),
+                statements.fetchall(
+                    self._sql(self._SELECT_SKILLS), (steamid, ))
+            )
+
+    def write_rows(self, players, heroes, skills, journal=(), trims=()):
+        """Writes rows into the database in a single transaction.
+
+        The journal entries are appended first, and the trims delete
+        the entries made obsolete by the written rows last.
+
+        Args:
+            players: Iterable of (steamid, gold, hero_cid, last_seen, name)
+                rows
+            heroes: Iterable of (steamid, cid, level, exp) rows,
+                or (steamid, cid, level, exp, packed_skills) in packed mode
+            skills: Iterable of (steamid, hero_cid, cid, level) rows
+            journal: Iterable of (steamid, hero_cid, seq, exp, gold)
+                reward journal entries
+            trims: Iterable of (steamid, hero_cid, seq) tuples, deleting
+                the journal entries up to seq
+        """
+
+        insert_hero = self._INSERT_PACKED_HERO if self.packed else (
+            self._INSERT_HERO)
+        with self._write() as statements:
+            statements.executemany(self._sql(self._INSERT_JOURNAL), journal)
+            statements.executemany(self._sql(self._INSERT_PLAYER), players)
+            statements.executemany(self._sql(insert_hero), heroes)
+            statements.executemany(self._sql(self._INSERT_SKILL), skills)
+            statements.executemany(self._sql(self._TRIM_JOURNAL), trims)
+
+    def _iter_rows(self, sql, key_parameters, key_size, batch_size):
+        """Iterates over a table's rows a batch at a time.
+
+        Each batch is fetched with its own query, continuing after the
+        key of the previous batch's last row, so only one batch is kept
+        in memory at a time.
+
+        Args:
+            sql: Query selecting the rows after a key, ordered by the key
+            key_parameters: Function turning a key into the query's
+                parameters
+            key_size: Amount of key columns at the start of each row
+            batch_size: Amount of rows fetched per query
+
+        Yields:
+            The rows in the order of their keys
+        """
+
+        key = ('', ) * key_size
+        while True:
+            with self._read() as statements:
+                rows = statements.fetchall(
+                    self._sql(sql), key_parameters(*key) + (batch_size, ))
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            key = tuple(rows[-1][:key_size])
+
+    def iter_players(self, batch_size=1000):
+        """Iterates over all the player rows.
+
+        The rows are (steamid, gold, hero_cid, last_seen, name) tuples.
+
+        Args:
+            batch_size: Amount of rows fetched per query
+        """
+
+        return self._iter_rows(
+            self._SELECT_PLAYERS_AFTER,
+            lambda steamid: (steamid, ),
+            1, batch_size
+        )
+
+    def iter_heroes(self, batch_size=1000):
+        """Iterates over all the hero rows.
+
+        The rows are (steamid, cid, level, exp, packed_skills) tuples,
+        with packed_skills being None unless in packed mode.
+
+        Args:
+            batch_size: Amount of rows fetched per query
+        """
+
+        return self._iter_rows(
+            self._SELECT_PACKED_HEROES_AFTER if self.packed else (
+                self._SELECT_HEROES_AFTER),
+            lambda steamid, cid: (steamid, steamid, cid),
+            2, batch_size
+        )
+
+    def iter_skills(self, batch_size=1000):
+        """Iterates over all the (steamid, hero_cid, cid, level) rows.
+
+        Args:
+            batch_size: Amount of rows fetched per query
+        """
+
+        return self._iter_rows(
+            self._SELECT_SKILLS_AFTER,
+            lambda steamid, hero_cid, cid: (
+                steamid, steamid, hero_cid, hero_cid, cid),
+            3, batch_size
+        )
+
+    def fetch_journal_seq(self):
+        """Fetches the highest sequence number in the reward journal.
+
+        Returns:
+            The highest sequence number, 0 if the journal is empty
+        """
+
+        with self._read() as statements:
+            row = statements.fetchone(self._sql(self._SELECT_JOURNAL_SEQ))
+        return row[0] or 0
+
+    def compact_journal(self):
+        """Folds the reward journal into the players and heroes tables.
+
+        Adds each player's journaled gold to his players row and each
+        hero's journaled exp to its heroes row, creating the rows if
+        needed, and deletes the folded entries. The exp may exceed the
+        exp required for the next level, the hero levels up when
+        it's loaded.
+
+        Returns:
+            Amount of journal entries folded
+        """
+
+        with self._write() as statements:
+            last_id = statements.fetchone(
+                self._sql(self._SELECT_JOURNAL_ID))[0]
+            if last_id is None:
+                return 0
+            sums = statements.fetchall(
+                self._sql(self._SELECT_JOURNAL_SUMS), (last_id, ))
+
+            gold = [(steamid, int(gold))
+                for steamid, hero_cid, exp, gold in sums if not hero_cid]
+            exp = [(steamid, hero_cid, int(exp))
+                for steamid, hero_cid, exp, gold in sums if hero_cid]
+
+            statements.executemany(
+                self._sql(self._INSERT_MISSING_PLAYER),
+                ((steamid, ) for steamid, _ in gold)
+            )
+            statements.executemany(
+                self._sql(self._ADD_PLAYER_GOLD),
+                ((amount, steamid) for steamid, amount in gold)
+            )
+            statements.executemany(
+                self._sql(self._INSERT_MISSING_HERO),
+                ((steamid, cid) for steamid, cid, _ in exp)
+            )
+            statements.executemany(
+                self._sql(self._ADD_HERO_EXP),
+                ((amount, steamid, cid) for steamid, cid, amount in exp)
+            )
+            return statements.execute(
+                self._sql(self._DELETE_JOURNAL), (last_id, )).rowcount
+
+    def pack_skills(self, skill_layouts, batch_size=200):
+        """Converts the skills table's rows into packed hero columns.
+
+        Streams through the skills table a batch of players at a time,
+        packing each hero's skill levels into the hero's row and
+        deleting the converted skill rows in the same transaction.
+        Skill rows of heroes missing from skill_layouts are left as
+        they are. The layouts are stored with write_skill_layouts().
+        Safe to interrupt and call again.
+
+        Args:
+            skill_layouts: Dict of skill cid tuples keyed by hero cid,
+                in the order of the heroes' skill sets
+            batch_size: Amount of players converted per transaction
+
+        Returns:
+            Amount of heroes converted
+        """
+
+        self.write_skill_layouts(skill_layouts.values())
+        layout_ids = {
+            hero_cid: skill_layout_id(layout)
+            for hero_cid, layout in skill_layouts.items()
+        }
+        converted = 0
+        last_steamid = ''
+        while True:
+            with self._write() as statements:
+                steamids = [row[0] for row in statements.fetchall(
+                    self._sql(self._SELECT_SKILL_STEAMIDS),
+                    (last_steamid, batch_size)
+                )]
+                if not steamids:
+                    break
+                last_steamid = steamids[-1]
+
+                # Group the batch's skill levels per hero
+                heroes = {}
+                for steamid, hero_cid, cid, level in statements.fetchall(
+                        self._sql(self._SELECT_SKILLS_IN.format(
+                            ', '.join('?' * len(steamids)))),
+                        steamids):
+                    heroes.setdefault((steamid, hero_cid), {})[cid] = level
+
+                # Pack the levels of known heroes
+                keys = []
+                rows = []
+                for (steamid, hero_cid), levels in heroes.items():
+                    layout = skill_layouts.get(hero_cid)
+                    if layout is not None:
+                        keys.append((steamid, hero_cid))
+                        rows.append((
+                            pack_skill_levels(
+                                [levels.get(cid, 0) for cid in layout],
+                                layout_ids[hero_cid]),
+                            steamid,
+                            hero_cid
+                        ))
+
+                statements.executemany(
+                    self._sql(self._UPDATE_PACKED_SKILLS), rows)
+                statements.executemany(
+                    self._sql(self._DELETE_HERO_SKILLS), keys)
+                converted += len(rows)
+        return converted
+
+    def write_skill_layouts(self, layouts):
+        """Stores skill layouts, so packed skill levels can be unpacked.
+
+        Layouts which are already stored are skipped.
+
+        Args:
+            layouts: Iterable of skill cid tuples
+        """
+
+        with self._write() as statements:
+            statements.executemany(
+                self._sql(self._INSERT_SKILL_LAYOUT),
+                [(skill_layout_id(layout), ','.join(layout))
+                 for layout in layouts]
+            )
+
+    def fetch_skill_layouts(self):
+        """Fetches the stored skill layouts.
+
+        Returns:
+            Dict of skill cid tuples keyed by their layout ids
+        """
+
+        with self._read() as statements:
+            return {
+                layout_id: tuple(cids.split(',')) if cids else ()
+                for layout_id, cids in statements.fetchall(
+                    self._sql(self._SELECT_SKILL_LAYOUTS))
+            }
+
+    def fetch_top_players(self, limit):
+        """Fetches the players with the most gold.
+
+        Args:
+            limit: Maximum amount of players to fetch
+
+        Returns:
+            List of (steamid, name, gold) rows, richest first
+        """
+
+        with self._read() as statements:
+            return statements.fetchall(
+                self._sql(self._SELECT_TOP_PLAYERS), (limit, ))
+
+    def fetch_top_heroes(self, hero_cid, limit):
+        """Fetches the highest leveled heroes of a hero class.
+
+        Args:
+            hero_cid: Class id of the heroes
+            limit: Maximum amount of heroes to fetch
+
+        Returns:
+            List of (steamid, name, level, exp) rows, highest first
+        """
+
+        with self._read() as statements:
+            return statements.fetchall(
+                self._sql(self._SELECT_TOP_HEROES), (hero_cid, limit))
+
+    def analyze(self, table):
+        """Updates the query planner's statistics of a table.
+
+        Args:
+            table: Name of the table
+        """
+
+        with self._write() as statements:
+            statements.execute(self._sql(self._ANALYZE.format(table)))
+
+    def incremental_vacuum(self, pages):
+        """Returns free pages of the database file to the file system.
+
+        Args:
+            pages: Maximum amount of pages to free
+
+        Returns:
+            Tuple of the amounts of pages freed and free pages left
+
+        Raises:
+            NotImplementedError: If the backend doesn't support vacuum
+        """
+
+        raise NotImplementedError
+
+    def vacuum(self):
+        """Rebuilds the whole database file.
+
+        Blocks all the other writes until done.
+
+        Raises:
+            NotImplementedError: If the backend doesn't support vacuum
+        """
+
+        raise NotImplementedError
+
+    def archive_players(self, before, path, batch_size=50, exclude=()):
+        """Moves a batch of inactive players into an archive database.
+
+        The players' rows, heroes and skills are copied into the archive
+        and deleted from the database in a single transaction.
+
+        Args:
+            before: Timestamp the players have been last seen before
+            path: Path to the archive database
+            batch_size: Maximum amount of players to move
+            exclude: Set of steamids never to move, like the players
+                whose data is loaded
+
+        Returns:
+            Amount of players moved
+
+        Raises:
+            NotImplementedError: If the backend doesn't support archiving
+        """
+
+        raise NotImplementedError
+
+    def restore_player(self, steamid, path):
+        """Moves a player's rows back from the archive database.
+
+        Args:
+            steamid: Steamid of the player
+            path: Path to the archive database
+
+        Returns:
+            True if the player was found in the archive
+
+        Raises:
+            NotImplementedError: If the backend doesn't support archiving
+        """
+
+        raise NotImplementedError
+
+
+class SQLiteBackend(Backend):
+    """Stores the data into a local SQLite database file.
+
+    Each reading thread gets its own connection, writes go through
+    a single connection shared by the writing threads.
+    New database files are created in incremental auto-vacuum mode,
+    older files are converted by vacuum().
+    """
+
+    errors = (sqlite3.Error, )
+
+    _CREATE_TABLES = (
+        """CREATE TABLE IF NOT EXISTS players (
+            steamid TEXT PRIMARY KEY,
+            gold INTEGER,
+            hero_cid TEXT,
+            last_seen INTEGER,
+            name TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS heroes (
+            steamid TEXT,
+            cid TEXT,
+            level INTEGER,
+            exp INTEGER,
+            skills BLOB,
+            PRIMARY KEY (steamid, cid)
+        )""",
+        """CREATE TABLE IF NOT EXISTS skills (
+            steamid TEXT,
+            hero_cid TEXT,
+            cid TEXT,
+            level INTEGER,
+            PRIMARY KEY (steamid, hero_cid, cid)
+        )""",
+        """CREATE TABLE IF NOT EXISTS journal (
+            id INTEGER PRIMARY KEY,
+            steamid TEXT,
+            hero_cid TEXT,
+            seq INTEGER,
+            exp INTEGER,
+            gold INTEGER
+        )""",
+        """CREATE INDEX IF NOT EXISTS journal_owner
+            ON journal (steamid, hero_cid, seq)""",
+        """CREATE TABLE IF NOT EXISTS skill_layouts (
+            id INTEGER PRIMARY KEY,
+            cids TEXT
+        )"""
+    )
+
+    # Rows sampled per index by ANALYZE, so that analyzing a big table
+    # doesn't hold the write lock for long. Ignored before SQLite 3.32.
+    _ANALYSIS_LIMIT = 1000
+
+    # Columns copied into the archive database, per table
+    _ARCHIVED_COLUMNS = {
+        'players': 'steamid, gold, hero_cid, last_seen, name',
+        'heroes': 'steamid, cid, level, exp, skills',
+        'skills': 'steamid, hero_cid, cid, level'
+    }
+
+    _SELECT_INACTIVE = (
+        "SELECT steamid FROM main.players WHERE last_seen < ? "
+        "ORDER BY last_seen LIMIT ?")
+    _COPY_ROWS = (
+        "INSERT OR REPLACE INTO {target}.{table} ({columns}) "
+        "SELECT {columns} FROM {source}.{table} WHERE steamid IN ({marks})")
+    _DELETE_ROWS = "DELETE FROM {source}.{table} WHERE steamid IN ({marks})"
+    _SELECT_ARCHIVED = "SELECT 1 FROM archive.players WHERE steamid=?"
+
+    def __init__(
+            self, path=database_path, profile=database_profile,
+            packed=packed_skills):
+        """Initializes a new SQLite backend.
+
+        Args:
+            path: Path to the database file
+            profile: Name of the connection profile in database_profiles
+            packed: Store skill levels packed into the heroes table
+        """
+
+        self.path = path
+        self.profile = profile
+        self.packed = packed
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = None
+
+    def connect(self):
+        """Opens a connection to the database using the profile.
+
+        Returns:
+            The new connection
+        """
+
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        # Only takes effect on new database files, before anything else
+        connection.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        for name, value in database_profiles[self.profile].items():
+            connection.execute('PRAGMA {0}={1}'.format(name, value))
+        return connection
+
+    @contextmanager
+    def _read(self):
+        statements = getattr(self._local, 'statements', None)
+        if statements is None:
+            statements = self._local.statements = Statements(self.connect())
+            with self._readers_lock:
+                self._readers.append(statements)
+        yield statements
+
+    def _has_column(self, statements, table, column):
+        return any(
+            row[1] == column for row in statements.fetchall(
+                'PRAGMA table_info({0})'.format(table))
+        )
+
+    def _get_writer(self):
+        """Gets the writer's Statements object, opening it if needed.
+
+        Must be called while holding the write lock.
+        """
+
+        if self._writer is None:
+            self._writer = Statements(self.connect())
+        return self._writer
+
+    def _has_index(self, statements, table, index):
+        return any(
+            row[1] == index for row in statements.fetchall(
+                'PRAGMA index_list({0})'.format(table))
+        )
+
+    @contextmanager
+    def _write(self):
+        with self._write_lock:
+            writer = self._get_writer()
+            with writer.connection:
+                yield writer
+
+    def analyze(self, table):
+        with self._write() as statements:
+            statements.execute(
+                'PRAGMA analysis_limit={0}'.format(self._ANALYSIS_LIMIT))
+            statements.execute(self._ANALYZE.format(table))
+
+    def incremental_vacuum(self, pages):
+        with self._write() as statements:
+            if statements.fetchone('PRAGMA auto_vacuum')[0] != 2:
+                return 0, 0
+            before = statements.fetchone('PRAGMA freelist_count')[0]
+            statements.fetchall(
+                'PRAGMA incremental_vacuum({0})'.format(int(pages)))
+            left = statements.fetchone('PRAGMA freelist_count')[0]
+            return before - left, left
+
+    def vacuum(self):
+        with self._write_lock:
+            self._get_writer().execute('VACUUM')
+
+    @contextmanager
+    def _attach_archive(self, path):
+        """Attaches the archive database to the writer connection.
+
+        Creates the archive's tables if they're missing.
+
+        Args:
+            path: Path to the archive database
+
+        Yields:
+            The writer connection, in a transaction
+        """
+
+        with self._write_lock:
+            connection = self._get_writer().connection
+
+            # Databases can't be attached inside a transaction
+            connection.execute('ATTACH DATABASE ? AS archive', (path, ))
+            try:
+                with connection:
+                    for sql in self._CREATE_TABLES[:3]:
+                        connection.execute(sql.replace(
+                            'IF NOT EXISTS ', 'IF NOT EXISTS archive.'))
+                    yield connection
+            finally:
+                connection.execute('DETACH DATABASE archive')
+
+    def _move_rows(self, connection, source, target, steamids):
+        """Moves players' rows between the databases of a connection.
+
+        Args:
+            connection: Connection with both databases attached
+            source: Name of the database to move the rows from
+            target: Name of the database to move the rows into
+            steamids: Steamids of the players
+        """
+
+        marks = ', '.join('?' * len(steamids))
+        for table, columns in self._ARCHIVED_COLUMNS.items():
+            connection.execute(self._COPY_ROWS.format(
+                source=source, target=target, table=table,
+                columns=columns, marks=marks
+            ), steamids)
+            connection.execute(self._DELETE_ROWS.format(
+                source=source, table=table, marks=marks), steamids)
+
+    def archive_players(self, before, path, batch_size=50, exclude=()):
+        with self._attach_archive(path) as connection:
+
+            # Fetch enough rows to fill the batch after skipping the
+            # excluded players
+            steamids = [
+                row[0] for row in connection.execute(
+                    self._SELECT_INACTIVE,
+                    (before, batch_size + len(exclude)))
+                if row[0] not in exclude
+            ][:batch_size]
+            if steamids:
+                self._move_rows(connection, 'main', 'archive', steamids)
+            return len(steamids)
+
+    def restore_player(self, steamid, path):
+        if not os.path.exists(path):
+            return False
+        with self._attach_archive(path) as connection:
+            if connection.execute(
+                    self._SELECT_ARCHIVED, (steamid, )).fetchone() is None:
+                return False
+            self._move_rows(connection, 'archive', 'main', [steamid])
+            return True
+
+    def close(self):
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            for statements in self._readers:
+                statements.close()
+            self._readers.clear()
+        self._local = threading.local()
+
+
+class MySQLBackend(Backend):
+    """Stores the data into a MySQL or MariaDB server.
+
+    Allows multiple servers to share the same progression.
+    Connections are borrowed from a bounded pool, so multiple players'
+    data can be loaded concurrently. Requires PyMySQL.
+    """
+
+    errors = (pymysql.MySQLError, ) if pymysql is not None else ()
+
+    _CREATE_TABLES = (
+        """CREATE TABLE IF NOT EXISTS players (
+            steamid VARCHAR(64) PRIMARY KEY,
+            gold INTEGER,
+            hero_cid VARCHAR(64),
+            last_seen BIGINT,
+            name VARCHAR(128)
+        )""",
+        """CREATE TABLE IF NOT EXISTS heroes (
+            steamid VARCHAR(64),
+            cid VARCHAR(64),
+            level INTEGER,
+            exp INTEGER,
+            skills BLOB,
+            PRIMARY KEY (steamid, cid)
+        )""",
+        """CREATE TABLE IF NOT EXISTS skills (
+            steamid VARCHAR(64),
+            hero_cid VARCHAR(64),
+            cid VARCHAR(64),
+            level INTEGER,
+            PRIMARY KEY (steamid, hero_cid, cid)
+        )""",
+        """CREATE TABLE IF NOT EXISTS journal (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            steamid VARCHAR(64),
+            hero_cid VARCHAR(64),
+            seq BIGINT,
+            exp INTEGER,
+            gold INTEGER,
+            INDEX journal_owner (steamid, hero_cid, seq)
+        )""",
+        """CREATE TABLE IF NOT EXISTS skill_layouts (
+            id BIGINT PRIMARY KEY,
+            cids TEXT
+        )"""
+    )
+
+    _ADD_COLUMNS = (
+        ('heroes', 'skills', 'BLOB'),
+        ('players', 'last_seen', 'BIGINT'),
+        ('players', 'name', 'VARCHAR(128)')
+    )
+
+    _ANALYZE = "ANALYZE TABLE {0}"
+
+    def __init__(
+            self, settings=database_server, pool_size=database_pool_size,
+            packed=packed_skills):
+        """Initializes a new MySQL backend.
+
+        Args:
+            settings: Keyword arguments for pymysql.connect()
+            pool_size: Maximum amount of connections to the server
+            packed: Store skill levels packed into the heroes table
+
+        Raises:
+            ImportError: If PyMySQL is not installed
+        """
+
+        if pymysql is None:
+            raise ImportError('The mysql backend requires PyMySQL.')
+        self.settings = settings
+        self.packed = packed
+        self._pool = ConnectionPool(self.connect, pool_size)
+        self._translated = {}
+
+    def connect(self):
+        """Opens a new connection to the server.
+
+        Returns:
+            The new connection
+        """
+
+        return pymysql.connect(autocommit=False, **self.settings)
+
+    def _sql(self, sql):
+        translated = self._translated.get(sql)
+        if translated is None:
+            translated = self._translated[sql] = sql.replace(
+                'INSERT OR REPLACE', 'REPLACE').replace(
+                'INSERT OR IGNORE', 'INSERT IGNORE').replace('?', '%s')
+        return translated
+
+    def _has_column(self, statements, table, column):
+        return statements.fetchone(
+            'SHOW COLUMNS FROM {0} LIKE %s'.format(table), (column, )
+        ) is not None
+
+    def _has_index(self, statements, table, index):
+        return statements.fetchone(
+            'SHOW INDEX FROM {0} WHERE Key_name = %s'.format(table), (index, )
+        ) is not None
+
+    @contextmanager
+    def _read(self):
+        with self._pool.statements() as statements:
+            yield statements
+
+            # End the transaction to see other servers' changes
+            statements.connection.rollback()
+
+    @contextmanager
+    def _write(self):
+        with self._pool.statements() as statements:
+            try:
+                yield statements
+            except Exception:
+                statements.connection.rollback()
+                raise
+            statements.connection.commit()
+
+    def close(self):
+        self._pool.close()
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def skill_layout_id(layout):
+    """Gets the id of a hero's skill layout.
+
+    Args:
+        layout: Tuple of the cids in the hero's skill set
+
+    Returns:
+        A 32-bit checksum of the cids
+    """
+
+    return zlib.crc32(','.join(layout).encode('utf-8'))
+
+
+def pack_skill_levels(levels, layout_id):
+    """Packs a hero's skill levels into bytes.
+
+    The first byte is the format version: version 1 stores each level
+    in a single byte, version 2 in two bytes for levels over 255.
+    It's followed by the four byte id of the skill layout the levels
+    are in, so they can be matched to skills by cid when a hero's
+    skill set changes.
+
+    Args:
+        levels: Skill levels in the order of the hero's skill set
+        layout_id: skill_layout_id() of the hero's skill set
+
+    Returns:
+        The packed skill levels
+    """
+
+    if all(level <= 0xFF for level in levels):
+        return struct.pack('<BI', 1, layout_id) + bytes(levels)
+    return struct.pack(
+        '<BI{0}H'.format(len(levels)), 2, layout_id, *levels)
+
+
+def unpack_skill_levels(data):
+    """Unpacks skill levels packed with pack_skill_levels().
+
+    Args:
+        data: The packed skill levels, or None
+
+    Returns:
+        Tuple of the layout id, or None if there's no data, and a tuple
+        of the skill levels in the order of the layout
+
+    Raises:
+        ValueError: If the format version is unknown
+    """
+
+    if not data:
+        return None, ()
+    data = bytes(data)
+    version, layout_id = struct.unpack_from('<BI', data)
+    if version == 1:
+        return layout_id, tuple(data[5:])
+    elif version == 2:
+        return layout_id, struct.unpack_from(
+            '<{0}H'.format((len(data) - 5) // 2), data, 5)
+    raise ValueError('Unknown packed skills version: {0}'.format(version))
+
+
+# ======================================================================
+# >> GLOBALS
+# ======================================================================
+
+# Backend classes by the names used in configs.database_backend
+backend_classes = {
+    'sqlite': SQLiteBackend,
+    'mysql': MySQLBackend
+}
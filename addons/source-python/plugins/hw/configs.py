@@ -28,6 +28,123 @@ chat_command_prefix = '!'
 database_path = os.path.dirname(__file__) + '/hw.db'
 
 
+# Storage backend used by Hero-Wars
+# > 'sqlite': Local database file at database_path
+# > 'mysql': MySQL/MariaDB server shared by multiple servers (PyMySQL)
+database_backend = 'sqlite'
+
+
+# Connection settings for the 'mysql' backend, passed to pymysql.connect()
+database_server = {
+    'host': 'localhost',
+    'port': 3306,
+    'user': 'hw',
+    'password': '',
+    'database': 'hw'
+}
+
+
+# Maximum amount of simultaneous connections to the 'mysql' backend
+database_pool_size = 4
+
+
+# SQLite connection profiles, see https://www.sqlite.org/pragma.html
+# > cache_size: Negative values are in KiB, positive values in pages
+# > busy_timeout: Milliseconds to wait for a locked database
+database_profiles = {
+
+    # Write-ahead logging, safe against crashes of the server process
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'busy_timeout': 5000
+    },
+
+    # SQLite's own defaults
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'busy_timeout': 5000
+    },
+
+    # Fastest, but may lose the latest saves if the machine crashes
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -32000,
+        'mmap_size': 268435456,
+        'busy_timeout': 5000
+    }
+}
+
+
+# Name of the connection profile used by Hero-Wars
+database_profile = 'default'
+
+
+# Store heroes' skill levels packed into the heroes table instead of
+# one row per skill in the skills table. Existing skill rows are
+# converted when Hero-Wars loads, the conversion can't be undone.
+# > The levels are stored with the layout of the hero's skill_set, so
+#   they're matched to the skills by cid when the skill set changes
+packed_skills = False
+
+
+# Seconds between the background writer's flushes of queued saves
+save_interval = 5.0
+
+
+# Seconds between the foldings of the reward journal into the database
+journal_compact_interval = 60.0
+
+
+# Hours between the background maintenance runs of the database,
+# None to only run it with the "hw_db maintenance run" server command
+maintenance_interval = 6
+
+
+# Seconds of maintenance work done at once, and seconds to pause between,
+# so that the maintenance doesn't hold up the saves
+maintenance_step_time = 0.05
+maintenance_pause = 0.5
+
+
+# Players not seen for this many days are moved into the archive
+# database at archive_path by the maintenance, None to keep everyone.
+# Archived players are moved back when they join the server again.
+# > Only supported by the 'sqlite' backend
+archive_inactive_days = None
+archive_path = os.path.dirname(__file__) + '/hw_archive.db'
+
+
+# Amount of worker threads loading players' data when they connect
+# > Loads run concurrently up to database_pool_size on the 'mysql' backend
+prefetch_workers = 2
+
+
+# Amount of recently disconnected players whose data is kept in memory,
+# so that they can rejoin without their data being loaded again
+# > Set to 0 when sharing the database with other servers
+reconnect_cache_size = 64
+
+
+# Seconds a disconnected player's data is kept in memory
+reconnect_cache_ttl = 600
+
+
+# Amount of players shown on each leaderboard
+leaderboard_size = 10
+
+
+# Seconds between the reloads of the leaderboards from the database,
+# online players' entries are kept up to date in between
+leaderboard_refresh_interval = 300.0
+
+
 # Amounts of experience points gained from objectives
 exp_values = {
 
@@ -92,6 +209,10 @@ default_item_category = 'Others'
 item_sell_value_multiplier = 0.5
 
 
+# Reset a player's skill cooldowns when he dies
+reset_cooldowns_on_death = False
+
+
 # Exp algorithm for required exp to level up
 def exp_algorithm(level):
     return 100 + level * 20
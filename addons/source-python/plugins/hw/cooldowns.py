@@ -0,0 +1,144 @@
+# ======================================================================
+# >> IMPORTS
+# ======================================================================
+
+# Hero-Wars
+from hw.configs import reset_cooldowns_on_death
+
+# Python
+import time
+
+# Source.Python
+from events import Event
+
+
+# ======================================================================
+# >> ALL DECLARATION
+# ======================================================================
+
+__all__ = (
+    'start_cooldown',
+    'get_cooldown',
+    'get_cooldowns',
+    'reset_cooldowns'
+)
+
+
+# ======================================================================
+# >> GLOBALS
+# ======================================================================
+
+# Players' cooldowns keyed by userid, each a dict of (end, duration)
+# tuples keyed by (skill class, method name)
+_cooldowns = {}
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def start_cooldown(userid, skill_cls, method_name, duration):
+    """Puts a player's skill method on cooldown.
+
+    Args:
+        userid: Userid of the player
+        skill_cls: Class of the skill
+        method_name: Name of the skill's method
+        duration: Seconds until the method can be used again
+    """
+
+    _cooldowns.setdefault(userid, {})[skill_cls, method_name] = (
+        time.monotonic() + duration, duration)
+
+
+def get_cooldown(userid, skill_cls, method_name):
+    """Gets the cooldown of a player's skill method.
+
+    Args:
+        userid: Userid of the player
+        skill_cls: Class of the skill
+        method_name: Name of the skill's method
+
+    Returns:
+        Tuple of the remaining and total seconds, or None if the
+        method isn't on cooldown
+    """
+
+    cooldowns = _cooldowns.get(userid)
+    if not cooldowns:
+        return None
+    cooldown = cooldowns.get((skill_cls, method_name))
+    if cooldown is None:
+        return None
+    remaining = cooldown[0] - time.monotonic()
+    if remaining <= 0:
+        del cooldowns[skill_cls, method_name]
+        return None
+    return remaining, cooldown[1]
+
+
+def get_cooldowns(userid):
+    """Gets all of a player's active cooldowns.
+
+    Args:
+        userid: Userid of the player
+
+    Returns:
+        Dict of (remaining, total) seconds keyed by
+        (skill class, method name)
+    """
+
+    cooldowns = _cooldowns.get(userid)
+    if not cooldowns:
+        return {}
+    now = time.monotonic()
+    for key, (end, duration) in tuple(cooldowns.items()):
+        if end <= now:
+            del cooldowns[key]
+    return {
+        key: (end - now, duration)
+        for key, (end, duration) in cooldowns.items()
+    }
+
+
+def reset_cooldowns(userid=None):
+    """Ends cooldowns right away.
+
+    Args:
+        userid: Userid of the player whose cooldowns to end,
+            None for everyone's
+    """
+
+    if userid is None:
+        _cooldowns.clear()
+    else:
+        _cooldowns.pop(userid, None)
+
+
+# ======================================================================
+# >> GAME EVENTS
+# ======================================================================
+
+@Event
+def round_start(game_event):
+    """Resets everyone's cooldowns."""
+
+    reset_cooldowns()
+
+
+@Event
+def player_death(game_event):
+    """Resets the cooldowns of the player who died.
+
+    Only if configs.reset_cooldowns_on_death is set.
+    """
+
+    if reset_cooldowns_on_death:
+        reset_cooldowns(game_event.get_int('userid'))
+
+
+@Event
+def player_disconnect(game_event):
+    """Forgets the cooldowns of the player who left."""
+
+    reset_cooldowns(game_event.get_int('userid'))
@@ -4,21 +4,111 @@
 
 # Hero-Wars
 from hw.entities import Hero
+from hw.entities import HeroRecord
 
-from hw.tools import find_element
+from hw.backends import backend_classes
+from hw.backends import skill_layout_id
+from hw.backends import pack_skill_levels
+from hw.backends import unpack_skill_levels
 
-from hw.configs import database_path
+from hw.configs import database_backend
+from hw.configs import packed_skills
+from hw.configs import save_interval
+from hw.configs import journal_compact_interval
+from hw.configs import prefetch_workers
+from hw.configs import maintenance_interval
+from hw.configs import maintenance_step_time
+from hw.configs import maintenance_pause
+from hw.configs import archive_inactive_days
+from hw.configs import archive_path
 
 # Python
-import sqlite3
-from contextlib import closing
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 
 # ======================================================================
 # >> GLOBALS
 # ======================================================================
 
-connection = None
+# Storage backend in use, see hw.backends
+backend = None
+
+# Logger of the database's warnings and errors
+_logger = logging.getLogger(__name__)
+
+# Serializes the writes of the writer thread and flush()
+_write_lock = threading.Lock()
+
+# Queued rows waiting to be written, coalesced per player and hero
+_queue_lock = threading.Lock()
+_queued_players = {}
+_queued_heroes = {}
+_queued_skills = {}
+
+# Reward journal entries waiting to be appended, the sequence number of
+# the latest entry, and the latest entries covered by the queued rows
+_queued_journal = []
+_journal_seq = 0
+_queued_trims = {}
+_last_compaction = 0.0
+
+# Amounts of rows written and skipped for not having changed
+save_stats = {
+    'written': 0,
+    'skipped': 0
+}
+
+# Background writer thread
+_writer = None
+_writer_stop = threading.Event()
+
+# Stored skill layouts of the packed skill levels, skill cid tuples
+# keyed by their layout ids
+_skill_layouts = {}
+
+# Prefetched rows of connecting players, futures keyed by steamid
+_prefetcher = None
+_prefetched = {}
+
+# Seconds to wait for a prefetch which is already running
+_PREFETCH_WAIT = 1.0
+
+# How players' data got loaded, and time spent blocked on loads
+load_stats = {
+    'prefetched': 0,
+    'blocking': 0,
+    'blocking_time': 0.0
+}
+
+# Functions getting the steamids of the players whose data is kept in
+# memory, see register_loaded_steamids()
+_loaded_steamids_getters = []
+
+# Background maintenance thread, and the event to start a run right away
+_maintainer = None
+_maintenance_requested = threading.Event()
+
+# Has the backend's lack of archiving been logged
+_archive_warned = False
+
+# Amounts of work done per maintenance step
+_VACUUM_PAGES = 64
+_ARCHIVE_BATCH = 20
+
+# Progress of the latest maintenance run
+maintenance_status = {
+    'running': False,
+    'task': None,
+    'steps': 0,
+    'vacuumed': 0,
+    'archived': 0,
+    'last_run': None,
+    'message': 'No maintenance run yet.'
+}
 
 
 # ======================================================================
@@ -26,129 +116,619 @@ connection = None
 # ======================================================================
 
 def setup():
-    """Creates the Hero-Wwars tables into the database."""
-
-    global connection
-    connection = sqlite3.connect(database_path)
-    with closing(connection.cursor()) as cursor:
-        cursor.execute("""CREATE TABLE IF NOT EXISTS players (
-            steamid TEXT PRIMARY KEY,
-            gold INTEGER,
-            hero_cid TEXT
-        )""")
-        cursor.execute("""CREATE TABLE IF NOT EXISTS heroes (
-            steamid TEXT,
-            cid TEXT,
-            level INTEGER,
-            exp INTEGER,
-            PRIMARY KEY (steamid, cid)
-        )""")
-        cursor.execute("""CREATE TABLE IF NOT EXISTS skills (
-            steamid TEXT,
-            hero_cid TEXT,
-            cid TEXT,
-            level INTEGER,
-            PRIMARY KEY (steamid, hero_cid, cid)
-        )""")
+    """Opens the storage backend and creates the Hero-Wars tables.
+
+    The backend is picked with configs.database_backend. If
+    configs.packed_skills is set, existing skill rows get packed.
+    Rewards left in the journal by a crash are folded into the tables.
+    Also starts the background writer thread which flushes the save
+    queue every save_interval seconds, the prefetch workers and the
+    maintenance thread.
+    """
+
+    global backend, _writer, _prefetcher, _journal_seq, _last_compaction
+    global _maintainer
+    backend = backend_classes[database_backend]()
+    backend.setup()
+
+    # Recover the rewards of a crashed session
+    backend.compact_journal()
+    _journal_seq = backend.fetch_journal_seq()
+    _last_compaction = time.monotonic()
+    if packed_skills:
+        backend.pack_skills({
+            hero_cls.cid: tuple(skill.cid for skill in hero_cls.skill_set)
+            for hero_cls in Hero.get_subclasses()
+        })
+        _skill_layouts.update(backend.fetch_skill_layouts())
+
+    # Start the writer
+    _writer_stop.clear()
+    _writer = threading.Thread(target=_writer_loop, name='hw.database')
+    _writer.daemon = True
+    _writer.start()
+
+    # Start the prefetch workers
+    _prefetcher = ThreadPoolExecutor(max_workers=prefetch_workers)
+
+    # Start the maintenance
+    _maintenance_requested.clear()
+    _maintainer = threading.Thread(
+        target=_maintenance_loop, name='hw.database.maintenance')
+    _maintainer.daemon = True
+    _maintainer.start()
+
+
+def close():
+    """Stops the writer, flushes the save queue and closes the backend.
+
+    Used when Hero-Wars is being unloaded.
+    """
+
+    global _writer, _prefetcher, _maintainer
+    if _prefetcher is not None:
+        _prefetcher.shutdown()
+        _prefetcher = None
+    _prefetched.clear()
+    _writer_stop.set()
+    _maintenance_requested.set()
+    if _maintainer is not None:
+        _maintainer.join()
+        _maintainer = None
+    if _writer is not None:
+        _writer.join()
+        _writer = None
+    flush()
+    backend.close()
+
+
+def _writer_loop():
+    """Flushes the save queue periodically until close() is called.
+
+    Also compacts the reward journal every journal_compact_interval
+    seconds. Errors are logged and don't stop the loop, rows whose
+    write failed with a backend error are retried on the next round.
+    """
+
+    global _last_compaction
+    while not _writer_stop.wait(save_interval):
+        try:
+            flush()
+            if time.monotonic() - _last_compaction >= journal_compact_interval:
+                compact_journal()
+                _last_compaction = time.monotonic()
+        except backend.errors as error:
+            _logger.warning(
+                'Writing into the database failed, retrying: %s', error)
+        except Exception:
+            _logger.exception('Writing into the database failed.')
+
+
+def _maintenance_loop():
+    """Runs the maintenance every maintenance_interval hours.
+
+    Also runs it whenever request_maintenance() is called, until
+    close() is called.
+    """
+
+    timeout = None
+    if maintenance_interval is not None:
+        timeout = maintenance_interval * 3600
+    while True:
+        _maintenance_requested.wait(timeout)
+        _maintenance_requested.clear()
+        if _writer_stop.is_set():
+            return
+        run_maintenance()
+
+
+def request_maintenance():
+    """Starts a maintenance run on the maintenance thread.
+
+    Returns:
+        False if a maintenance run is already in progress
+    """
+
+    if maintenance_status['running']:
+        return False
+    _maintenance_requested.set()
+    return True
+
+
+def run_maintenance():
+    """Runs the database maintenance in small time-boxed steps.
+
+    Steps are run back to back for maintenance_step_time seconds,
+    followed by a pause of maintenance_pause seconds for the saves to
+    get through. Tasks the backend doesn't support are skipped.
+    The progress is kept in maintenance_status.
+    """
+
+    maintenance_status.update(
+        running=True, task=None, steps=0, vacuumed=0, archived=0)
+    try:
+        slice_start = time.monotonic()
+        for task in _maintenance_steps():
+            maintenance_status['task'] = task
+            maintenance_status['steps'] += 1
+            if _writer_stop.is_set():
+                maintenance_status['message'] = 'Maintenance interrupted.'
+                return
+            if time.monotonic() - slice_start >= maintenance_step_time:
+                _writer_stop.wait(maintenance_pause)
+                slice_start = time.monotonic()
+    except backend.errors as error:
+        maintenance_status['message'] = (
+            'Maintenance failed on {0}: {1}'.format(
+                maintenance_status['task'], error))
+    else:
+        maintenance_status['message'] = (
+            'Maintenance done in {steps} steps, archived {archived} '
+            'players and freed {vacuumed} pages.'.format(**maintenance_status))
+    finally:
+        maintenance_status.update(running=False, last_run=time.time())
+
+
+def _maintenance_steps():
+    """Does the maintenance work, yielding after each small step.
+
+    Yields:
+        Name of the task of the finished step
+    """
+
+    global _archive_warned
+
+    # Fold the journal first, so that no rewards are left for archiving
+    compact_journal()
+    yield 'compact'
+
+    # Move the inactive players into the archive
+    if archive_inactive_days is not None:
+        before = int(time.time() - archive_inactive_days * 86400)
+        try:
+            while True:
+                moved = backend.archive_players(
+                    before, archive_path, _ARCHIVE_BATCH,
+                    exclude=_get_loaded_steamids())
+                if not moved:
+                    break
+                maintenance_status['archived'] += moved
+                yield 'archive'
+        except NotImplementedError:
+            if not _archive_warned:
+                _archive_warned = True
+                _logger.warning(
+                    'The %s backend can\'t archive players, '
+                    'archive_inactive_days is ignored.', database_backend)
+
+    # Return the free pages to the file system
+    try:
+        while True:
+            freed, left = backend.incremental_vacuum(_VACUUM_PAGES)
+            if not freed:
+                break
+            maintenance_status['vacuumed'] += freed
+            yield 'vacuum'
+            if not left:
+                break
+    except NotImplementedError:
+        pass
+
+    # Update the query planner's statistics
+    for table in ('players', 'heroes', 'skills', 'journal'):
+        backend.analyze(table)
+        yield 'analyze ' + table
+
+
+def register_loaded_steamids(getter):
+    """Registers a function getting steamids of players kept in memory.
+
+    The maintenance never archives these players, since saving their
+    data later would only write back the rows that have changed.
+
+    Can be used as a decorator.
+
+    Args:
+        getter: Function returning an iterable of steamids, called from
+            the maintenance thread
+
+    Returns:
+        The getter
+    """
+
+    _loaded_steamids_getters.append(getter)
+    return getter
+
+
+def _get_loaded_steamids():
+    """Gets the steamids of the players whose data is in memory.
+
+    Returns:
+        Set of the steamids, including the ones being prefetched
+    """
+
+    steamids = set(list(_prefetched))
+    for getter in _loaded_steamids_getters:
+        steamids.update(getter())
+    return steamids
+
+
+def compact_journal():
+    """Folds the reward journal into the players and heroes tables.
+
+    Returns:
+        Amount of journal entries folded
+    """
+
+    with _write_lock:
+        return backend.compact_journal()
+
+
+def flush():
+    """Writes all the queued saves into the database.
+
+    The queued rows are written in a single transaction. If the write
+    fails, the rows are put back into the queue unless newer data for
+    the same player or hero has been queued meanwhile.
+    Safe to call from any thread, used directly for a synchronous save
+    upon unload and player disconnect.
+
+    Raises:
+        backend.errors: If writing into the database fails
+    """
+
+    global _queued_players, _queued_heroes, _queued_skills
+    global _queued_journal, _queued_trims
+    with _write_lock:
+
+        # Take the current queue
+        with _queue_lock:
+            players, _queued_players = _queued_players, {}
+            heroes, _queued_heroes = _queued_heroes, {}
+            skills, _queued_skills = _queued_skills, {}
+            journal, _queued_journal = _queued_journal, []
+            trims, _queued_trims = _queued_trims, {}
+        if not players and not heroes and not skills and not journal:
+            return
+
+        try:
+            backend.write_rows(
+                [(steamid, ) + value for steamid, value in players.items()],
+                [key + value for key, value in heroes.items()],
+                [key + (level, ) for key, level in skills.items()],
+                journal,
+                [key + (seq, ) for key, seq in trims.items()]
+            )
+
+        # Put the rows back into the queue, newer data wins
+        except backend.errors:
+            with _queue_lock:
+                for key, value in players.items():
+                    _queued_players.setdefault(key, value)
+                for key, value in heroes.items():
+                    _queued_heroes.setdefault(key, value)
+                for key, value in skills.items():
+                    _queued_skills.setdefault(key, value)
+                for key, seq in trims.items():
+                    _queued_trims[key] = max(seq, _queued_trims.get(key, 0))
+                _queued_journal[:0] = journal
+            raise
+
+
+def journal_exp(steamid, hero_cid, exp):
+    """Appends gained exp into the reward journal.
+
+    The entry is written by the next flush, without rewriting the
+    hero's row. Used for rewards, so that they survive a crash.
+
+    Args:
+        steamid: Steamid of the hero's owner
+        hero_cid: Class id of the hero
+        exp: Amount of exp gained
+    """
+
+    global _journal_seq
+    with _queue_lock:
+        _journal_seq += 1
+        _queued_journal.append((steamid, hero_cid, _journal_seq, exp, 0))
+
+
+def journal_gold(steamid, gold):
+    """Appends gained gold into the reward journal.
+
+    Args:
+        steamid: Steamid of the player
+        gold: Amount of gold gained
+    """
+
+    global _journal_seq
+    with _queue_lock:
+        _journal_seq += 1
+        _queued_journal.append((steamid, '', _journal_seq, 0, gold))
 
 
 def save_player_data(player):
-    """Saves player's data into the database.
+    """Queues player's data to be saved into the database.
+
+    Only the rows which have changed since the last save get queued,
+    see save_stats for the amounts of written and skipped rows.
+    The player's row also stores his name and the time he was last seen.
+    The written rows replace the player's reward journal entries.
 
     Args:
         player: player whose data to save
     """
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(
-            "INSERT OR REPLACE INTO players VALUES (?, ?, ?)",
-            (player.steamid, player.gold, player.hero.cid)
-        )
-    save_hero_data(player.steamid, player.hero)  # Calls database.commit()
+    if player.dirty:
+        with _queue_lock:
+            _queued_players[player.steamid] = (
+                player.gold, player.hero.cid, int(time.time()), player.name)
+            _queued_trims[player.steamid, ''] = _journal_seq
+        player.dirty = False
+        save_stats['written'] += 1
+    else:
+        save_stats['skipped'] += 1
+    save_hero_data(player.steamid, player.hero)
 
 
 def save_hero_data(steamid, hero):
-    """Saves hero's data into the database.
+    """Queues hero's changed data to be saved into the database.
 
     Args:
         steamid: Steamid of the hero's owner
         hero: Hero whose data to save
     """
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(
-            "INSERT OR REPLACE INTO heroes VALUES (?, ?, ?, ?)",
-            (steamid, hero.cid, hero.level, hero.exp)
-        )
+    # Pack all the skills into the hero's row if any of them changed
+    if packed_skills:
+        layout_id = _get_skill_layout_id(type(hero))
+        with _queue_lock:
+            if hero.dirty or any(skill.dirty for skill in hero.skills):
+                _queued_heroes[steamid, hero.cid] = (
+                    hero.level, hero.exp, pack_skill_levels(
+                        [skill.level for skill in hero.skills], layout_id)
+                )
+                _queued_trims[steamid, hero.cid] = _journal_seq
+                hero.dirty = False
+                for skill in hero.skills:
+                    skill.dirty = False
+                save_stats['written'] += 1
+            else:
+                save_stats['skipped'] += 1
+        return
+
+    written = 0
+    with _queue_lock:
+        if hero.dirty:
+            _queued_heroes[steamid, hero.cid] = (hero.level, hero.exp)
+            _queued_trims[steamid, hero.cid] = _journal_seq
+            hero.dirty = False
+            written += 1
         for skill in hero.skills:
-            cursor.execute(
-                "INSERT OR REPLACE INTO skills VALUES (?, ?, ?, ?)",
-                (steamid, hero.cid, skill.cid, skill.level)
-            )
-    connection.commit()
+            if skill.dirty:
+                _queued_skills[steamid, hero.cid, skill.cid] = skill.level
+                skill.dirty = False
+                written += 1
+    save_stats['written'] += written
+    save_stats['skipped'] += 1 + len(hero.skills) - written
+
+
+def prefetch_player_data(steamid):
+    """Starts loading player's rows on a worker thread.
+
+    Called when a player connects, so that load_player_data() can build
+    the player's data from memory instead of querying the database.
+
+    Args:
+        steamid: Steamid of the connecting player
+    """
+
+    if _prefetcher is not None and steamid not in _prefetched:
+        _prefetched[steamid] = _prefetcher.submit(
+            _fetch_player_rows, steamid)
+
+
+def discard_prefetched(steamid=None):
+    """Forgets prefetched rows which no player has loaded.
+
+    Args:
+        steamid: Steamid of the rows to forget, None for all of them
+    """
+
+    if steamid is None:
+        futures = list(_prefetched.values())
+        _prefetched.clear()
+    else:
+        futures = [_prefetched.pop(steamid, None)]
+    for future in futures:
+        if future is not None:
+            future.cancel()
+
+
+def fetch_leaderboards(hero_cids, size):
+    """Starts fetching the leaderboards on a worker thread.
+
+    Args:
+        hero_cids: Class ids of the heroes to rank
+        size: Amount of rows fetched per leaderboard
+
+    Returns:
+        Future of a tuple of the (steamid, name, gold) player rows and
+        a dict of the (steamid, name, level, exp) rows keyed by hero cid
+    """
+
+    return _prefetcher.submit(_fetch_leaderboards, hero_cids, size)
+
+
+def _fetch_leaderboards(hero_cids, size):
+    """Fetches the leaderboards, see fetch_leaderboards()."""
+
+    return backend.fetch_top_players(size), {
+        cid: backend.fetch_top_heroes(cid, size) for cid in hero_cids
+    }
 
 
 def load_player_data(player):
     """Loads player's data from the database.
 
+    Uses the rows prefetched upon connect, waiting for them for a
+    while if they're still being fetched. If the prefetch hasn't
+    started or fails, falls back to a blocking load. The time spent
+    waiting is counted into load_stats. The blocking load fetches the
+    player's row, his heroes and all of their skills with one query
+    per table. A player missing from the database is moved back from
+    the archive if he's there.
+
     Args:
         player: player whose data to load
     """
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(
-            "SELECT gold, hero_cid FROM players WHERE steamid=?",
-            (player.steamid, )
-        )
-        gold, current_hero_cid = cursor.fetchone() or (0, None)
-        player.gold = gold
-
-        # Load player's heroes
-        cursor.execute(
-            "SELECT cid, level, exp FROM heroes WHERE steamid=?",
-            (player.steamid, )
-        )
-        heroes = cursor.fetchall()
-
-    # Load heroes data
-    hero_classes = Hero.get_subclasses()
-    for cid, level, exp in heroes:
-        hero_cls = find_element(hero_classes, 'cid', cid)
+    start_time = time.perf_counter()
+    rows = None
+
+    # Use the prefetched rows unless the fetch is still queued
+    future = _prefetched.pop(player.steamid, None)
+    if future is not None and not future.cancel():
+        try:
+            rows = future.result(timeout=_PREFETCH_WAIT)
+            load_stats['prefetched'] += 1
+        except Exception:
+            rows = None
+
+    # Else load them right now
+    if rows is None:
+        rows = _fetch_player_rows(player.steamid)
+        load_stats['blocking'] += 1
+    load_stats['blocking_time'] += time.perf_counter() - start_time
+
+    _build_player_data(player, *rows)
+
+
+def _fetch_player_rows(steamid):
+    """Fetches player's rows, restoring him from the archive if needed.
+
+    Args:
+        steamid: Steamid of the player
+
+    Returns:
+        The rows, see Backend.fetch_player_rows()
+    """
+
+    rows = backend.fetch_player_rows(steamid)
+    if rows[0] is None and os.path.exists(archive_path):
+        try:
+            if backend.restore_player(steamid, archive_path):
+                rows = backend.fetch_player_rows(steamid)
+        except NotImplementedError:
+            pass
+    return rows
+
+
+def _build_player_data(player, player_row, hero_rows, skill_rows):
+    """Sets player's gold and heroes from his database rows.
+
+    Only the player's current hero is created as a Hero object, the
+    others are stored as HeroRecords.
+
+    Args:
+        player: Player whose data to set
+        player_row: Player's (gold, hero_cid) row or None
+        hero_rows: Player's (cid, level, exp, packed_skills) hero rows
+        skill_rows: Player's (hero_cid, cid, level) skill rows
+    """
+
+    gold, current_hero_cid = player_row or (0, None)
+    player.gold = gold
+
+    # Group the skill levels per hero
+    skill_levels = {}
+    for hero_cid, cid, level in skill_rows:
+        skill_levels.setdefault(hero_cid, {})[cid] = level
+
+    # Create the heroes
+    for cid, level, exp, packed in hero_rows:
+        hero_cls = Hero.from_cid(cid)
         if hero_cls:
-            hero = hero_cls(level, exp)
-            load_hero_data(player.steamid, hero)
+            if packed is not None:
+                levels = unpack_hero_skills(packed)
+            else:
+                levels = skill_levels.get(cid, {})
+            if cid != current_hero_cid:
+                player.heroes.append(HeroRecord(cid, level, exp, (
+                    levels.get(skill.cid, 0)
+                    for skill in hero_cls.skill_set
+                ), persisted=True))
+                continue
+            hero = hero_cls()
+            _set_hero_data(hero, level, exp, levels)
             player.heroes.append(hero)
-            if cid == current_hero_cid:
-                player.hero = hero
+            player.hero = hero
+
+    # Save the player's row even if nothing changes, so that his last
+    # seen time gets updated and the maintenance won't archive him
+    player.dirty = True
 
 
-def load_hero_data(steamid, hero):
-    """Loads hero's data from the database.
+def _set_hero_data(hero, level, exp, skill_levels):
+    """Sets hero's level, exp and skill levels.
 
     Args:
-        steamid: Steamid of the hero's owner
-        hero: Hero whose data to load
-    """
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(
-            "SELECT level, exp FROM heroes WHERE steamid=? AND cid=?",
-            (steamid, hero.cid)
-        )
-        level, exp = cursor.fetchone() or (0, 0)
-        if hero.max_level is not None and level > hero.max_level:
-            hero.level = hero.max_level
-        else:
-            hero.level = level
-        hero.exp = exp
-
-        # Load hero's skills
-        for skill in hero.skills:
-            cursor.execute(
-                "SELECT level FROM skills "
-                "WHERE steamid=? AND hero_cid=? AND cid=?",
-                (steamid, hero.cid, skill.cid)
-            )
-            data = cursor.fetchone()
-            if data:
-                skill.level = data[0]
+        hero: Hero whose data to set
+        level: Hero's level
+        exp: Hero's experience points
+        skill_levels: Dict of hero's skill levels keyed by skill cid
+    """
+
+    if hero.max_level is not None and level > hero.max_level:
+        hero.level = hero.max_level
+    else:
+        hero.level = level
+    hero.exp = exp
+    hero.dirty = False
+    for skill in hero.skills:
+        if skill.cid in skill_levels:
+            skill.level = skill_levels[skill.cid]
+            skill.dirty = False
+
+
+def _get_skill_layout_id(hero_cls):
+    """Gets the layout id of a hero's skill set, storing new layouts.
+
+    Args:
+        hero_cls: Class of the hero
+
+    Returns:
+        The layout id
+    """
+
+    layout = tuple(skill.cid for skill in hero_cls.skill_set)
+    layout_id = skill_layout_id(layout)
+    if layout_id not in _skill_layouts:
+        backend.write_skill_layouts((layout, ))
+        _skill_layouts[layout_id] = layout
+    return layout_id
+
+
+def unpack_hero_skills(packed):
+    """Unpacks a hero's packed skill levels.
+
+    The levels are matched to the skills by cid using the stored skill
+    layout they were packed in, so they stay with the right skills
+    when the hero's skill set changes.
+
+    Args:
+        packed: Hero's packed skill levels
+
+    Returns:
+        Dict of hero's skill levels keyed by skill cid, empty if the
+        layout is unknown
+    """
+
+    layout_id, levels = unpack_skill_levels(packed)
+    layout = _skill_layouts.get(layout_id)
+    if layout is None:
+        if levels:
+            _logger.warning(
+                'Unknown skill layout %s, resetting the skills.', layout_id)
+        return {}
+    return dict(zip(layout, levels))
@@ -0,0 +1,333 @@
+# ======================================================================
+# >> IMPORTS
+# ======================================================================
+
+# Hero-Wars
+import hw.database
+
+from hw.entities import Hero
+
+# Python
+import json
+import threading
+from collections import Counter
+
+# Source.Python
+from commands.server import ServerCommand
+
+from core import echo_console
+
+
+# ======================================================================
+# >> GLOBALS
+# ======================================================================
+
+# Status of the latest export or import
+_status = {
+    'job': None,
+    'rows': 0,
+    'running': False,
+    'message': 'No jobs run yet.'
+}
+
+_usage = (
+    'Usage: hw_db export <path> [chunk_size]\n'
+    '       hw_db import <path> [chunk_size]\n'
+    '       hw_db status\n'
+    '       hw_db maintenance [run|status]\n'
+    '       hw_db vacuum\n'
+    'chunk_size is a positive integer, 1000 by default.'
+)
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def _skill_layouts():
+    """Gets the saved skills' cids of each hero class.
+
+    Returns:
+        Dict of skill cid tuples keyed by hero cid
+    """
+
+    return {
+        hero_cls.cid: tuple(skill.cid for skill in hero_cls.skill_set)
+        for hero_cls in Hero.get_subclasses()
+    }
+
+
+def _format_skipped(skipped):
+    """Formats the counts of skipped cids into a report line."""
+
+    if not skipped:
+        return 'Skipped nothing.'
+    return 'Skipped unknown cids: {0}'.format(', '.join(
+        '{0} ({1})'.format(cid, count)
+        for cid, count in sorted(skipped.items())
+    ))
+
+
+def export_database(path, chunk_size=1000):
+    """Exports the database into a line-delimited JSON file.
+
+    Each line is a JSON object of a single row, with the name of its
+    table in the "table" key. Rows are streamed from the database
+    chunk_size rows at a time. Heroes and skills with cids unknown to
+    the server are skipped.
+
+    Args:
+        path: Path to the exported file
+        chunk_size: Amount of rows fetched at once
+
+    Returns:
+        Counter of the exported rows per table and the skipped cids
+
+    Raises:
+        ValueError: If chunk_size is not positive
+    """
+
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive.')
+    backend = hw.database.backend
+    layouts = _skill_layouts()
+    exported = Counter()
+    skipped = Counter()
+
+    def write(file, table, **row):
+        file.write(json.dumps(dict(row, table=table)) + '\n')
+        exported[table] += 1
+        _status['rows'] += 1
+
+    with open(path, 'w') as file:
+        for steamid, gold, hero_cid, last_seen, name in backend.iter_players(
+                chunk_size):
+            write(
+                file, 'players', steamid=steamid, gold=gold,
+                hero_cid=hero_cid, last_seen=last_seen, name=name
+            )
+
+        for steamid, cid, level, exp, packed in backend.iter_heroes(
+                chunk_size):
+            if cid not in layouts:
+                skipped[cid] += 1
+                continue
+            write(
+                file, 'heroes', steamid=steamid, cid=cid, level=level,
+                exp=exp
+            )
+            for skill_cid, skill_level in sorted(
+                    hw.database.unpack_hero_skills(packed).items()):
+                if skill_cid not in layouts[cid]:
+                    skipped['{0}.{1}'.format(cid, skill_cid)] += 1
+                    continue
+                write(
+                    file, 'skills', steamid=steamid, hero_cid=cid,
+                    cid=skill_cid, level=skill_level
+                )
+
+        for steamid, hero_cid, cid, level in backend.iter_skills(chunk_size):
+            if cid not in layouts.get(hero_cid, ()):
+                skipped['{0}.{1}'.format(hero_cid, cid)] += 1
+                continue
+            write(
+                file, 'skills', steamid=steamid, hero_cid=hero_cid,
+                cid=cid, level=level
+            )
+
+    return exported, skipped
+
+
+def import_database(path, chunk_size=1000):
+    """Imports a file written by export_database() into the database.
+
+    Lines are read and written chunk_size rows at a time, each chunk
+    in its own transaction. Rows with unknown hero or skill cids are
+    skipped. Imported rows replace the existing rows with the same
+    keys, so players shouldn't be on the server during an import.
+
+    Args:
+        path: Path to the imported file
+        chunk_size: Amount of rows written per transaction
+
+    Returns:
+        Counter of the imported rows per table and the skipped cids
+
+    Raises:
+        ValueError: If chunk_size is not positive
+    """
+
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive.')
+    backend = hw.database.backend
+    layouts = _skill_layouts()
+    imported = Counter()
+    skipped = Counter()
+    chunk = {'players': [], 'heroes': [], 'skills': []}
+
+    def write_chunk():
+        backend.write_rows(chunk['players'], chunk['heroes'], chunk['skills'])
+        for table, rows in chunk.items():
+            imported[table] += len(rows)
+            _status['rows'] += len(rows)
+            del rows[:]
+
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            table = row['table']
+            if table == 'players':
+                chunk[table].append((
+                    row['steamid'], row['gold'], row['hero_cid'],
+                    row.get('last_seen'), row.get('name')
+                ))
+            elif table == 'heroes':
+                if row['cid'] not in layouts:
+                    skipped[row['cid']] += 1
+                    continue
+                chunk[table].append(
+                    (row['steamid'], row['cid'], row['level'], row['exp'])
+                    + ((None, ) if backend.packed else ())
+                )
+            elif table == 'skills':
+                if row['cid'] not in layouts.get(row['hero_cid'], ()):
+                    skipped['{hero_cid}.{cid}'.format(**row)] += 1
+                    continue
+                chunk[table].append((
+                    row['steamid'], row['hero_cid'], row['cid'], row['level']
+                ))
+            else:
+                raise ValueError('Unknown table: {0}'.format(table))
+            if sum(map(len, chunk.values())) >= chunk_size:
+                write_chunk()
+        write_chunk()
+
+    # Pack the imported skill rows into the heroes
+    if backend.packed:
+        backend.pack_skills(layouts, chunk_size)
+
+    return imported, skipped
+
+
+def _parse_chunk_size(arg):
+    """Parses a chunk size argument.
+
+    Returns:
+        The chunk size, or None if it's not a positive integer
+    """
+
+    try:
+        chunk_size = int(arg)
+    except ValueError:
+        return None
+    return chunk_size if chunk_size > 0 else None
+
+
+def _vacuum(path, chunk_size):
+    """Rebuilds the whole database file with the backend's vacuum()."""
+
+    hw.database.backend.vacuum()
+    return Counter(), Counter()
+
+
+def _maintenance_command(action):
+    """Starts the maintenance or reports its progress."""
+
+    status = hw.database.maintenance_status
+    if action == 'run':
+        if hw.database.request_maintenance():
+            echo_console('[Hero-Wars] Maintenance started.')
+        else:
+            echo_console('[Hero-Wars] Maintenance is already running.')
+    elif action == 'status':
+        if status['running']:
+            echo_console(
+                '[Hero-Wars] Maintenance running: {task}, {steps} steps, '
+                '{archived} players archived, {vacuumed} pages freed.'.format(
+                    **status))
+        else:
+            echo_console('[Hero-Wars] ' + status['message'])
+    else:
+        echo_console(_usage)
+
+
+def _run(job, path, chunk_size):
+    """Runs a database job, storing its outcome into _status."""
+
+    try:
+        done, skipped = job(path, chunk_size)
+    except Exception as error:
+        _status['message'] = '{0} of {1} failed: {2}'.format(
+            _status['job'], path, error)
+    else:
+        if not done:
+            _status['message'] = '{0} of {1} done.'.format(
+                _status['job'], path)
+            return
+        _status['message'] = '{0} of {1} done: {2}. {3}'.format(
+            _status['job'], path,
+            ', '.join(
+                '{1} {0}'.format(*item) for item in sorted(done.items())),
+            _format_skipped(skipped)
+        )
+    finally:
+        _status['running'] = False
+
+
+# ======================================================================
+# >> SERVER COMMANDS
+# ======================================================================
+
+@ServerCommand('hw_db')
+def server_command_db(command):
+    """Runs database jobs on a background thread.
+
+    Exports, imports and vacuums the database, and starts the
+    maintenance or reports its progress.
+    """
+
+    action = command.get_arg(1)
+    if action == 'status':
+        if _status['running']:
+            message = '{job} running, {rows} rows so far.'.format(**_status)
+        else:
+            message = _status['message']
+        echo_console('[Hero-Wars] ' + message)
+        return
+
+    if action == 'maintenance':
+        _maintenance_command(command.get_arg(2) or 'status')
+        return
+
+    jobs = {
+        'export': export_database,
+        'import': import_database,
+        'vacuum': _vacuum
+    }
+    if action not in jobs or (
+            action != 'vacuum' and command.get_arg_count() < 3):
+        echo_console(_usage)
+        return
+    if _status['running']:
+        echo_console('[Hero-Wars] {0} is already running.'.format(
+            _status['job']))
+        return
+
+    path = command.get_arg(2) or 'the database'
+    chunk_size = 1000
+    if command.get_arg_count() > 3:
+        chunk_size = _parse_chunk_size(command.get_arg(3))
+        if chunk_size is None:
+            echo_console(_usage)
+            return
+
+    _status.update(job=action.capitalize(), rows=0, running=True)
+    thread = threading.Thread(
+        target=_run, args=(jobs[action], path, chunk_size), name='hw.dbtool')
+    thread.daemon = True
+    thread.start()
+    echo_console('[Hero-Wars] {0} of {1} started.'.format(
+        _status['job'], path))
+
@@ -3,7 +3,6 @@
 # ======================================================================
 
 # Hero-Wars
-from hw.tools import get_subclasses
 from hw.tools import classproperty
 
 from hw.configs import default_hero_category
@@ -11,7 +10,12 @@ from hw.configs import default_item_category
 from hw.configs import item_sell_value_multiplier
 from hw.configs import exp_algorithm
 
-from hw.events import Hero_Pre_Level_Up
+from hw.signals import hero_level_up
+
+# Python
+import warnings
+import weakref
+from bisect import bisect_right
 
 # Source.Python
 from messages import SayText2
@@ -25,15 +29,107 @@ __all___ = (
     'Entity',
     'Hero',
     'Skill',
-    'Item'
+    'Item',
+    'HeroRecord'
 )
 
 
+# ======================================================================
+# >> GLOBALS
+# ======================================================================
+
+# Functions called with a hero whenever its dispatch table is cleared
+dispatch_listeners = []
+
+# Total exp required to reach each level from level 0, grown on demand
+_exp_table = [0]
+
+
 # ======================================================================
 # >> CLASSES
 # ======================================================================
 
-class Entity(object):
+class _EntityMeta(type):
+    """Metaclass registering Entity classes into their base classes.
+
+    Each entity class keeps a set of all its subclasses, filled as the
+    subclasses get defined. Different skills and items may share a cid,
+    like two heroes' skills both named Heal. A class defined again with
+    the same module and qualified name, like when its module is
+    reloaded, replaces the old class.
+
+    Heroes are also indexed by cid for Hero.from_cid(), since their
+    data is saved by cid. A hero whose cid is already used by another
+    hero is ignored with a warning, and the first one is kept.
+
+    The entity classes of this module get an empty __slots__ unless
+    they declare their own. Heroes, skills and items defined elsewhere
+    keep a __dict__ for any attributes they set, unless they opt in by
+    declaring __slots__ with their own attributes, if any:
+
+        class Frenzy(Skill):
+            __slots__ = ('stacks', )
+
+    Their instances then have no __dict__, and class data like name
+    and cost is shared by all instances.
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        """Creates a new entity class, with __slots__ if in this module."""
+
+        if attrs.get('__module__') == __name__:
+            attrs.setdefault('__slots__', ())
+        return super().__new__(mcs, name, bases, attrs)
+
+    def __init__(cls, name, bases, attrs):
+        """Registers a new entity class into its base classes."""
+
+        super().__init__(name, bases, attrs)
+        cls._subclasses = set()
+        cls._sorted_subclasses = None
+        bases = [
+            base for base in cls.__mro__[1:] if isinstance(base, _EntityMeta)]
+
+        # Make sure the cid isn't used by another hero
+        for base in bases:
+            index = base.__dict__.get('_classes_by_cid')
+            if index is None:
+                continue
+            registered = index.get(cls.cid)
+            if registered is not None and not _redefines(cls, registered):
+                warnings.warn(
+                    'Ignoring {0}.{1}, cid {2} is already used by {3}.{4}.'
+                    .format(cls.__module__, cls.__qualname__, cls.cid,
+                            registered.__module__, registered.__qualname__))
+                return
+            index[cls.cid] = cls
+
+        # Register the class, replacing its previous definition
+        for base in bases:
+            base._subclasses = {
+                subcls for subcls in base._subclasses
+                if not _redefines(cls, subcls)
+            }
+            base._subclasses.add(cls)
+            base._sorted_subclasses = None
+
+
+def _redefines(cls, old_cls):
+    """Checks if a class is a new definition of another class.
+
+    Args:
+        cls: New class
+        old_cls: Previously defined class
+
+    Returns:
+        True if the classes have the same module and qualified name
+    """
+
+    return (cls.__module__, cls.__qualname__) == (
+        old_cls.__module__, old_cls.__qualname__)
+
+
+class Entity(object, metaclass=_EntityMeta):
     """The base element of Hero-Wars.
 
     Entity is a base class for most of the Hero-Wars classes.
@@ -42,6 +138,7 @@ class Entity(object):
 
     Attributes:
         level: Entity's Hero-Wars level
+        dirty: Has the entity changed since it was last saved
 
     Class Attributes:
         name: Entity's name
@@ -53,6 +150,8 @@ class Entity(object):
         allowed_users: List of steamids of those who can use the entity
     """
 
+    __slots__ = ('_level', 'dirty')
+
     # Defaults
     name = str()
     description = str()
@@ -82,6 +181,7 @@ class Entity(object):
         """
 
         self._level = level
+        self.dirty = False
 
     @property
     def level(self):
@@ -108,19 +208,23 @@ class Entity(object):
             raise ValueError(
                 'Attempt to set an entity\'s level over it\'s maximum level.')
         self._level = level
+        self.dirty = True
 
     @classmethod
     def get_subclasses(cls):
-        """Gets a list of entity class's subclasses.
+        """Gets entity class's subclasses sorted by their cids.
+
+        The sorted tuple is cached until a new subclass is defined.
 
         Returns:
-            List of entity class's subclasses
+            Tuple of entity class's subclasses
         """
 
-        return sorted(
-            (subcls for subcls in get_subclasses(cls)),
-            key=lambda subcls: subcls.cid
-        )
+        if cls._sorted_subclasses is None:
+            cls._sorted_subclasses = tuple(sorted(
+                cls._subclasses,
+                key=lambda subcls: (subcls.cid, subcls.__module__)))
+        return cls._sorted_subclasses
 
     def get_message_prefix(self):
         """Getter for entity's message prefix.
@@ -145,6 +249,80 @@ class Entity(object):
         )).send((player_index,))
 
 
+class _ItemList(list):
+    """List of a hero's items, clearing the hero's dispatch table.
+
+    Any change to the list clears the dispatch table of the hero
+    owning the list, see Hero.execute_skills().
+    """
+
+    __slots__ = ('hero', )
+
+    def __init__(self, hero, items=()):
+        """Initializes a new item list.
+
+        Args:
+            hero: Hero who owns the items
+            items: Initial items
+        """
+
+        super().__init__(items)
+        self.hero = hero
+
+    def _changed(self):
+        """Sets the items' hero and clears its dispatch table."""
+
+        for item in self:
+            item.hero = self.hero
+        self.hero.clear_dispatch()
+
+    def append(self, item):
+        super().append(item)
+        self._changed()
+
+    def extend(self, items):
+        super().extend(items)
+        self._changed()
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._changed()
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, items):
+        super().__iadd__(items)
+        self._changed()
+        return self
+
+
 class Hero(Entity):
     """Heroes strenghten players, giving them a set of powerful skills.
 
@@ -157,7 +335,10 @@ class Hero(Entity):
     After leveling up, player can upgrade the hero's skills.
 
     Attributes:
-        skills: List of hero object's skills
+        skills: Tuple of hero object's skills
+        passives: Tuple of hero object's passive skills
+        items: List of hero object's items
+        owner: Player who owns the hero, or None
         exp: Hero's experience points for gradually leveling up
         required_exp: Experience points required for hero to level up
 
@@ -165,11 +346,16 @@ class Hero(Entity):
         skill_set (cls var): List of skill classes the hero will use
     """
 
+    __slots__ = ('_exp', 'skills', 'passives', 'items', '_dispatch', '_owner')
+
     # Defaults
     skill_set = tuple()
     passive_set = tuple()
     category = default_hero_category
 
+    # Hero classes keyed by their cids, filled by _EntityMeta
+    _classes_by_cid = {}
+
     def __init__(self, level=0, exp=0):
         """Initializes a new Hero-Wars hero.
 
@@ -180,9 +366,55 @@ class Hero(Entity):
 
         super().__init__(level)
         self._exp = exp
-        self.skills = [skill() for skill in self.skill_set]
-        self.passives = [passive() for passive in self.passive_set]
-        self.items = []
+        self.dirty = True
+        self.skills = tuple(skill() for skill in self.skill_set)
+        self.passives = tuple(passive() for passive in self.passive_set)
+        self.items = _ItemList(self)
+        for skill in self.skills + self.passives:
+            skill.hero = self
+        self._dispatch = {}
+        self._owner = None
+
+    @classmethod
+    def from_cid(cls, cid):
+        """Gets a hero class by its cid.
+
+        Args:
+            cid: Class id of the hero
+
+        Returns:
+            The hero class, or None if there's no such hero
+        """
+
+        return Hero._classes_by_cid.get(cid)
+
+    @property
+    def owner(self):
+        """Getter for hero's owner.
+
+        The owner is referenced weakly, so that a hero doesn't keep
+        its owner's Player object alive.
+
+        Returns:
+            Player who owns the hero, or None
+        """
+
+        if self._owner is None:
+            return None
+        return self._owner()
+
+    @owner.setter
+    def owner(self, player):
+        """Setter for hero's owner."""
+
+        self._owner = None if player is None else weakref.ref(player)
+
+    def _fire_level_up(self):
+        """Emits the hero_level_up signal if the owner is using the hero."""
+
+        owner = self.owner
+        if owner is not None and owner.hero is self:
+            hero_level_up.emit(player=owner, hero=self)
 
     @property
     def required_exp(self):
@@ -210,7 +442,7 @@ class Hero(Entity):
 
         self._exp = 0
         Entity.level.fset(self, level)  # Call to Entity's level setter
-        Hero_Pre_Level_Up(cid=self.cid, id=str(id(self))).fire()
+        self._fire_level_up()
 
     @property
     def exp(self):
@@ -227,7 +459,9 @@ class Hero(Entity):
         """Setter for hero's experience points.
 
         Sets hero's exp, increases hero's level as his experience points
-        reach their maximum.
+        reach their maximum. The new level is looked up from a table of
+        cumulative exp, so the cost doesn't depend on the amount of
+        levels gained. The level up event fires once per change.
 
         Raises:
             ValueError: If attempting to set exp to a negative value
@@ -239,24 +473,21 @@ class Hero(Entity):
 
         # If exp differs from current exp
         if exp != self._exp:
+            self.dirty = True
+            old_level = self._level
 
-            # Set the new exp and get old level
-            self._exp = exp
-            old_level = self.level
-
-            # Increase levels while necessary
-            while (self.exp >= self.required_exp and
-                    (self.max_level is None or self.level < self.max_level)):
-                self._exp -= self.required_exp
-                self._level += 1
+            # Resolve the new level from the hero's total exp
+            level, exp = _resolve_level(_total_exp(old_level) + exp)
 
             # Make sure the hero's level is not over the maximum level
-            if self.max_level is not None and self.level >= self.max_level:
-                self.level = self.max_level
+            if self.max_level is not None and level >= self.max_level:
+                level, exp = max(self.max_level, old_level), 0
+            self._level = level
+            self._exp = exp
 
             # Fire the level up event
-            if self.level > old_level:
-                Hero_Pre_Level_Up(cid=self.cid, id=str(id(self))).fire()
+            if level > old_level:
+                self._fire_level_up()
 
     @property
     def skill_points(self):
@@ -270,23 +501,69 @@ class Hero(Entity):
         return self._level - used_points
 
     def execute_skills(self, method_name, **eargs):
-        """Executes hero's skills and passives.
+        """Executes hero's skills, passives and items.
 
-        Calls each of hero's skills' and passives' execute() method with
-        the given eargs.
+        Calls the method_name method of each of hero's passives, leveled
+        skills and items which has one, with the given eargs.
+        The methods are looked up once per method name and kept in the
+        hero's dispatch table, until a skill gets leveled from or down
+        to zero or hero's items change.
 
         Args:
             method_name: Name of the method to execute
             eargs: Additional information of the event
         """
 
-        for passive in self.passives:
-            passive.execute_method(method_name, **eargs)
-        for skill in self.skills:
-            if skill.level:
-                skill.execute_method(method_name, **eargs)
-        for item in self.items:
-            item.execute_method(method_name, **eargs)
+        dispatch = self._dispatch.get(method_name)
+        if dispatch is None:
+            dispatch = self._build_dispatch(method_name)
+        for method, entity in dispatch:
+            method(entity, **eargs)
+
+    def _build_dispatch(self, method_name):
+        """Looks up the methods execute_skills() calls for a name.
+
+        Args:
+            method_name: Name of the method
+
+        Returns:
+            List of (method, entity) tuples in the order of execution
+        """
+
+        dispatch = self._dispatch[method_name] = []
+        entities = self.passives + tuple(
+            skill for skill in self.skills if skill.level)
+        for entity in entities + tuple(self.items):
+            method = getattr(entity.__class__, method_name, None)
+            if method:
+                dispatch.append((method, entity))
+        return dispatch
+
+    def clear_dispatch(self):
+        """Clears the dispatch table used by execute_skills().
+
+        Also notifies the functions in dispatch_listeners.
+        """
+
+        self._dispatch.clear()
+        for listener in dispatch_listeners:
+            listener(self)
+
+    def listens_to(self, method_name):
+        """Checks if execute_skills() would call anything for a method.
+
+        Args:
+            method_name: Name of the method
+
+        Returns:
+            True if any of hero's passives, leveled skills or items has
+            the method
+        """
+
+        dispatch = self._dispatch.get(method_name)
+        if dispatch is None:
+            dispatch = self._build_dispatch(method_name)
+        return bool(dispatch)
 
     @classmethod
     def skill(cls, skill_class):
@@ -332,13 +609,45 @@ class Skill(Entity):
     more versatile gameplay for Hero-Wars. Each hero has a certain skill
     set, and each skill gets used during a certain event or action to
     create a bonus effect, such as damaging the enemy.
+
+    Attributes:
+        hero: Hero who has the skill in its skills, passives or
+            items, or None
     """
 
+    __slots__ = ('hero', )
+
     # Defaults
     cost = int(1)
     max_level = int(6)
     required_level = int(0)
 
+    def __init__(self, level=0):
+        """Initializes a new Hero-Wars skill.
+
+        Args:
+            level: Skill's starting level
+        """
+
+        super().__init__(level)
+        self.hero = None
+
+    @Entity.level.setter
+    def level(self, level):
+        """Level setter for skill.
+
+        Clears the dispatch table of the skill's hero when the skill
+        gets leveled from or down to zero.
+
+        Args:
+            level: Level to set the skill to
+        """
+
+        was_leveled = bool(self._level)
+        Entity.level.fset(self, level)
+        if self.hero is not None and was_leveled != bool(level):
+            self.hero.clear_dispatch()
+
     def execute_method(self, method_name, **eargs):
         """Executes skill's method.
 
@@ -382,3 +691,133 @@ class Item(Skill):
         """
 
         return int(self.cost * item_sell_value_multiplier)
+
+
+class HeroRecord(object):
+    """Compact data of an owned hero which is not in use.
+
+    Only the hero a player is using needs its skill objects, so the
+    rest of his heroes are kept as records and materialized into Hero
+    objects when needed.
+
+    Attributes:
+        cid: Class id of the hero
+        level: Hero's level
+        exp: Hero's experience points
+        skill_levels: Tuple of skill levels in the order of skill_set
+        persisted: Is the data already saved into the database
+    """
+
+    __slots__ = ('cid', 'level', 'exp', 'skill_levels', 'persisted')
+
+    def __init__(
+            self, cid, level=0, exp=0, skill_levels=(), persisted=False):
+        """Initializes a new hero record.
+
+        Args:
+            cid: Class id of the hero
+            level: Hero's level
+            exp: Hero's experience points
+            skill_levels: Skill levels in the order of skill_set
+            persisted: Is the data already saved into the database
+        """
+
+        self.cid = cid
+        self.level = level
+        self.exp = exp
+        self.skill_levels = tuple(skill_levels)
+        self.persisted = persisted
+
+    @classmethod
+    def from_hero(cls, hero):
+        """Creates a record of a saved hero's data.
+
+        Args:
+            hero: Hero whose data to store
+
+        Returns:
+            The hero record
+        """
+
+        return cls(
+            hero.cid, hero.level, hero.exp,
+            (skill.level for skill in hero.skills), persisted=True
+        )
+
+    @property
+    def hero_class(self):
+        """Getter for the class of the hero.
+
+        Returns:
+            The Hero subclass, or None if it's not loaded
+        """
+
+        return Hero.from_cid(self.cid)
+
+    @property
+    def name(self):
+        """Getter for the hero's name."""
+
+        return self.hero_class.name
+
+    @property
+    def max_level(self):
+        """Getter for the hero's maximum level."""
+
+        return self.hero_class.max_level
+
+    def materialize(self):
+        """Creates a Hero object from the record.
+
+        The hero's level is capped to its maximum level. The hero is
+        only marked dirty if the record hasn't been persisted, like
+        the records of new players' starting heroes.
+
+        Returns:
+            The new hero
+        """
+
+        hero = self.hero_class()
+        hero._level = self.level
+        if hero.max_level is not None and self.level > hero.max_level:
+            hero._level = hero.max_level
+        hero._exp = self.exp
+        hero.dirty = not self.persisted
+        for skill, level in zip(hero.skills, self.skill_levels):
+            skill._level = level
+        return hero
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def _grow_exp_table(total_exp):
+    """Grows the exp table past a total amount of exp."""
+
+    while _exp_table[-1] <= total_exp:
+        _exp_table.append(
+            _exp_table[-1] + exp_algorithm(len(_exp_table) - 1))
+
+
+def _total_exp(level):
+    """Gets the total exp required to reach a level from level 0."""
+
+    while len(_exp_table) <= level:
+        _grow_exp_table(_exp_table[-1])
+    return _exp_table[level]
+
+
+def _resolve_level(total_exp):
+    """Resolves the level a total amount of exp is worth.
+
+    Args:
+        total_exp: Exp gained since level 0
+
+    Returns:
+        Tuple of the level and the exp left over towards the next level
+    """
+
+    _grow_exp_table(total_exp)
+    level = bisect_right(_exp_table, total_exp) - 1
+    return level, total_exp - _exp_table[level]
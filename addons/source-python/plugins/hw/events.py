@@ -15,7 +15,6 @@ from events.variable import ShortVariable
 # ======================================================================
 
 __all__ = (
-    'Hero_Pre_Level_Up',
     'Hero_Level_Up',
     'Player_Ultimate'
 )
@@ -25,11 +24,6 @@ __all__ = (
 # >> EVENT CLASSES
 # ======================================================================
 
-class Hero_Pre_Level_Up(CustomEvent):
-    cid = StringVariable("Hero's class' id")
-    id = StringVariable("Hero's unique Python id")
-
-
 class Hero_Level_Up(CustomEvent):
     cid = StringVariable("Hero's class' id")
     id = StringVariable("Hero's unique Python id")
@@ -49,7 +43,7 @@ class Player_Ultimate(CustomEvent):
 def load():
     """Create a resource file upon plugin loading."""
     resource_file = ResourceFile(
-        'hw', Hero_Pre_Level_Up, Hero_Level_Up, Player_Ultimate
+        'hw', Hero_Level_Up, Player_Ultimate
     )
     resource_file.write()
     resource_file.load_events()
@@ -0,0 +1,180 @@
+# ======================================================================
+# >> IMPORTS
+# ======================================================================
+
+# Hero-Wars
+from hw.entities import Hero
+from hw.entities import Item
+from hw.entities import dispatch_listeners
+
+# Source.Python
+from events.manager import event_manager
+
+from listeners.tick.repeat import TickRepeat
+
+
+# ======================================================================
+# >> ALL DECLARATION
+# ======================================================================
+
+__all__ = (
+    'on_demand',
+    'setup',
+    'unload',
+    'set_active_hero',
+    'remove_active_hero',
+    'update'
+)
+
+
+# ======================================================================
+# >> GLOBALS
+# ======================================================================
+
+# Handlers registered on demand, (callback, method names) keyed by the
+# name of the game event
+_handlers = {}
+
+# Names of the events with a registered handler
+_registered = set()
+
+# Names of the events which any skill or item class can handle
+_handled = set()
+
+# Heroes in use on the server, keyed by their owners' userids
+_active_heroes = {}
+
+# Updates are delayed to the next tick, so that handlers don't get
+# registered or unregistered while an event is being fired
+_update_repeat = None
+_update_pending = False
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def on_demand(*method_names):
+    """Decorates a game event handler to only be registered on demand.
+
+    The handler is registered for the game event with the same name as
+    the handler, while at least one active hero has one of the methods
+    execute_skills() gets called with. Doesn't register the handler,
+    setup() and update() do.
+
+    Args:
+        method_names: Names of the skill methods the handler executes
+
+    Returns:
+        Decorator which stores the handler
+    """
+
+    def decorator(callback):
+        _handlers[callback.__name__] = (callback, method_names)
+        return callback
+    return decorator
+
+
+def setup():
+    """Finds the events handled by the loaded heroes and items.
+
+    Events none of the skill, passive or item classes have a method for
+    are never registered. Must be called after the heroes and items
+    have been imported.
+    """
+
+    skill_classes = set(Item.get_subclasses())
+    for hero_cls in Hero.get_subclasses():
+        skill_classes.update(hero_cls.skill_set)
+        skill_classes.update(hero_cls.passive_set)
+
+    _handled.clear()
+    for event_name, (callback, method_names) in _handlers.items():
+        if any(hasattr(skill_cls, method_name)
+                for skill_cls in skill_classes
+                for method_name in method_names):
+            _handled.add(event_name)
+    update()
+
+
+def unload():
+    """Unregisters all the handlers registered on demand."""
+
+    global _update_pending
+    if _update_repeat is not None:
+        _update_repeat.stop()
+    _update_pending = False
+    for event_name in tuple(_registered):
+        event_manager.unregister_for_event(
+            event_name, _handlers[event_name][0])
+    _registered.clear()
+    _active_heroes.clear()
+
+
+def set_active_hero(userid, hero):
+    """Sets the hero a player is using.
+
+    Args:
+        userid: Userid of the player
+        hero: Player's current hero
+    """
+
+    _active_heroes[userid] = hero
+    _request_update()
+
+
+def remove_active_hero(userid):
+    """Removes a player's hero when he leaves the server.
+
+    Args:
+        userid: Userid of the player
+    """
+
+    if _active_heroes.pop(userid, None) is not None:
+        _request_update()
+
+
+def _on_dispatch_cleared(hero):
+    """Updates the registrations when an active hero's methods change."""
+
+    if hero in _active_heroes.values():
+        _request_update()
+
+
+def _request_update():
+    """Runs update() on the next tick."""
+
+    global _update_repeat, _update_pending
+    if _update_pending:
+        return
+    _update_pending = True
+    if _update_repeat is None:
+        _update_repeat = TickRepeat(update)
+    _update_repeat.start(0, 1)
+
+
+def update():
+    """Registers the handlers the active heroes need.
+
+    Handlers no longer needed by any of the active heroes get
+    unregistered.
+    """
+
+    global _update_pending
+    _update_pending = False
+    for event_name, (callback, method_names) in _handlers.items():
+        needed = event_name in _handled and any(
+            hero.listens_to(method_name)
+            for hero in _active_heroes.values()
+            for method_name in method_names
+        )
+        if needed and event_name not in _registered:
+            event_manager.register_for_event(event_name, callback)
+            _registered.add(event_name)
+        elif not needed and event_name in _registered:
+            event_manager.unregister_for_event(event_name, callback)
+            _registered.discard(event_name)
+
+
+# Update the registrations when a hero's skills or items change
+dispatch_listeners.append(_on_dispatch_cleared)
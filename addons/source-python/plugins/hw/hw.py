@@ -6,15 +6,16 @@
 from hw.player import Player
 
 import hw.database
+import hw.dbtool
+import hw.leaderboard
+import hw.gameevents
+import hw.signals
 
 from hw.entities import Hero
 
-from hw.events import Hero_Level_Up
-from hw.events import Player_Ultimate
 from hw.events import load as load_events
 
 from hw.tools import get_messages
-from hw.tools import find_element
 
 from hw.menus import menus
 
@@ -26,7 +27,6 @@ import hw.configs as cfg
 # Source.Python
 from events import Event
 
-from players.helpers import userid_from_playerinfo
 from players.helpers import index_from_playerinfo
 
 from engines.server import engine_server
@@ -88,14 +88,16 @@ def load():
     if not cfg.starting_heroes:
         raise NotImplementedError('No starting heroes set.')
     for cid in cfg.starting_heroes:
-        if not find_element(heroes, 'cid', cid):
+        if not Hero.from_cid(cid):
             raise ValueError('Invalid starting hero cid: {0}'.format(cid))
 
     # Setup database
     hw.database.setup()
+    hw.leaderboard.refresh(force=True)
 
     # Load Hero-Wars events
     load_events()
+    hw.gameevents.setup()
 
     # Restart the game
     engine_server.server_command('mp_restartgame 1\n')
@@ -107,14 +109,16 @@ def load():
 def unload():
     """Save all unsaved data into database."""
 
-    # Save each player's data into the database
+    # Queue each player's data to be saved
     for index in PlayerIter():
         player = Player(index)
         hw.database.save_player_data(player)
 
-    # Commit and close
-    hw.database.connection.commit()
-    hw.database.connection.close()
+    # Flush the queue and close
+    hw.database.close()
+
+    # Unregister the events registered on demand
+    hw.gameevents.unload()
 
     # Send a message to everyone
     other_messages['Plugin Unloaded'].send()
@@ -133,6 +137,7 @@ def give_gold(player, gold_key):
     gold = cfg.gold_values.get(gold_key, 0)
     if gold > 0:
         player.gold += gold
+        hw.database.journal_gold(player.steamid, gold)
         gold_messages[gold_key].send(player.index, gold=gold)
 
 
@@ -147,6 +152,8 @@ def give_exp(player, exp_key):
     exp = cfg.exp_values.get(exp_key, 0)
     if exp > 0:
         player.hero.exp += exp
+        hw.database.journal_exp(player.steamid, player.hero.cid, exp)
+        hw.leaderboard.update_hero(player, player.hero)
         exp_messages[exp_key].send(player.index, exp=exp)
 
 
@@ -172,12 +179,10 @@ def give_team_exp(player, exp_key):
 
 @ClientCommand('hw_ultimate')
 def client_command_ultimate(playerinfo, command):
-    """Raises ultimate event with player's information."""
+    """Emits the ultimate signal with the player."""
 
-    Player_Ultimate(
-        index=index_from_playerinfo(playerinfo),
-        userid=userid_from_playerinfo(playerinfo)
-    ).fire()
+    hw.signals.player_ultimate.emit(
+        player=Player(index_from_playerinfo(playerinfo)))
 
 
 @ClientCommand('hw_menu')
@@ -198,10 +203,7 @@ def client_command_menu(playerinfo, command):
 
 @Event
 def player_spawn(game_event):
-    """Saves player's data.
-
-    Also executes spawn skills and shows current exp/level progress.
-    """
+    """Executes spawn skills and shows current exp/level progress."""
 
     # Get the player and his hero
     player = Player.from_userid(game_event.get_int('userid'))
@@ -265,7 +267,7 @@ def player_death(game_event):
             defender.hero.items.remove(item)
 
 
-@Event
+@hw.gameevents.on_demand('player_attack', 'player_defend')
 def player_hurt(game_event):
     """Executes attack and defend skills."""
 
@@ -291,7 +293,7 @@ def player_hurt(game_event):
         defender.hero.execute_skills('player_defend', **eargs)
 
 
-@Event
+@hw.gameevents.on_demand('player_jump')
 def player_jump(game_event):
     """Executes jump skills."""
 
@@ -316,10 +318,7 @@ def player_say(game_event):
 
     # If the text was '!ultimate', execute ultimate skills
     if text2 == 'ultimate':
-        Player_Ultimate(
-            index=player.index,
-            userid=player.userid
-        ).fire()
+        hw.signals.player_ultimate.emit(player=player)
 
     # If the text was '!hw' or '!hw', open Main menu
     elif text2 in ('hw', 'hw'):
@@ -328,6 +327,10 @@ def player_say(game_event):
     elif text2 == 'admin' and player.steamid in cfg.admins:
         menus['Admin'].send(player.index)
 
+    # If the text was '!top', open Leaderboards menu
+    elif text2 == 'top':
+        menus['Leaderboards'].send(player.index)
+
     # Finally, execute hero's player_say skills
     player.hero.execute_skills('player_say', player=player, text=text)
 
@@ -336,7 +339,8 @@ def player_say(game_event):
 def round_end(game_event):
     """Give exp from round win and loss.
 
-    Also executes round_end skills.
+    Also executes round_end skills and reloads the leaderboards if
+    they're due for a refresh.
     """
 
     # Get the winning team
@@ -361,8 +365,11 @@ def round_end(game_event):
         # Execute hero's round_end skills
         player.hero.execute_skills('round_end', player=player, winner=winner)
 
+    # Reload the leaderboards
+    hw.leaderboard.refresh()
 
-@Event
+
+@hw.gameevents.on_demand('round_start')
 def round_start(game_event):
     """Executes round_start skills."""
 
@@ -437,42 +444,20 @@ def hostage_rescued(game_event):
     player.hero.execute_skills('hostage_rescued', player=player)
 
 
-@Event
-def hero_pre_level_up(game_event):
-    """Fetches the player and raises the Hero_Level_Up event."""
-
-    # Raise hero_level_up event
-    hero_id = int(game_event.get_string('id'))
-    owner = None
-    for index in PlayerIter():
-        player = Player(index)
-        if id(player.hero) == hero_id:
-            owner = player
-            break
-    if owner:
-        Hero_Level_Up(
-            cid=game_event.get_string('cid'),
-            id=str(hero_id),
-            player_index=player.index,
-            player_userid=player.userid
-        ).fire()
-
+# ======================================================================
+# >> SIGNALS
+# ======================================================================
 
-@Event
-def hero_level_up(game_event):
+@hw.signals.hero_level_up.connect
+def hero_level_up(player, hero):
     """Sends hero's status to player and opens current hero menu.
 
     Also executes hero_level_up skills.
     """
 
-    # Get the player and his hero
-    index = game_event.get_int('player_index')
-    player = Player(index)
-    hero = player.hero
-
     # Send hero's status via chat
     other_messages['Hero Status'].send(
-        index,
+        player.index,
         name=hero.name,
         level=hero.level,
         current=hero.exp,
@@ -481,15 +466,14 @@ def hero_level_up(game_event):
 
     # Open current hero info menu (Kamiqawa, what?) to let the player
     # spend skill points
-    menus['Current Hero'].send(index)
+    menus['Current Hero'].send(player.index)
 
     # Execute player's skills
-    player.hero.execute_skills('hero_level_up', player=player, hero=hero)
+    hero.execute_skills('hero_level_up', player=player, hero=hero)
 
 
-@Event
-def player_ultimate(game_event):
+@hw.signals.player_ultimate.connect
+def player_ultimate(player):
     """Executes ultimate skills."""
 
-    player = Player.from_userid(game_event.get_int('userid'))
     player.hero.execute_skills('player_ultimate', player=player)
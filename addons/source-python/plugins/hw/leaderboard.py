@@ -0,0 +1,277 @@
+# ======================================================================
+# >> IMPORTS
+# ======================================================================
+
+# Hero-Wars
+import hw.database
+
+from hw.entities import Hero
+
+from hw.configs import leaderboard_size
+from hw.configs import leaderboard_refresh_interval
+
+# Python
+import time
+from bisect import bisect_left
+from bisect import insort
+
+
+# ======================================================================
+# >> ALL DECLARATION
+# ======================================================================
+
+__all__ = (
+    'Ranking',
+    'get_ranking',
+    'refresh',
+    'add_player',
+    'remove_player',
+    'update_gold',
+    'update_hero'
+)
+
+
+# ======================================================================
+# >> CLASSES
+# ======================================================================
+
+class Ranking(object):
+    """Players ranked by a score, highest first.
+
+    The entries are kept in a sorted list, so updating a player's
+    score only moves his entry instead of sorting the whole ranking.
+    Scores are tuples of integers, compared item by item.
+    """
+
+    def __init__(self):
+        """Initializes a new empty ranking."""
+
+        self._order = []
+        self._scores = {}
+        self._names = {}
+
+    def __len__(self):
+        """Returns the amount of ranked players."""
+
+        return len(self._order)
+
+    def update(self, steamid, name, score):
+        """Sets a player's score and moves him to his new rank.
+
+        Args:
+            steamid: Steamid of the player
+            name: Name of the player
+            score: Tuple of integers the player is ranked by
+        """
+
+        old_score = self._scores.get(steamid)
+        if old_score is not None:
+            if old_score == score:
+                self._names[steamid] = name
+                return
+            del self._order[bisect_left(
+                self._order, (_negate(old_score), steamid))]
+        insort(self._order, (_negate(score), steamid))
+        self._scores[steamid] = score
+        self._names[steamid] = name
+
+    def get(self, steamid):
+        """Gets a player's name and score.
+
+        Returns:
+            Tuple of the player's name and score, or None
+        """
+
+        if steamid not in self._scores:
+            return None
+        return self._names[steamid], self._scores[steamid]
+
+    def rank(self, steamid):
+        """Gets a player's rank, starting from 1.
+
+        Only the ranks up to the amount of rows loaded from the database
+        are exact. A player ranked past them is compared to the other
+        online players only, and may be further down in the database.
+
+        Returns:
+            The player's rank, or None if he's not ranked
+        """
+
+        score = self._scores.get(steamid)
+        if score is None:
+            return None
+        return bisect_left(self._order, (_negate(score), steamid)) + 1
+
+    def top(self, count):
+        """Gets the highest ranked players.
+
+        Args:
+            count: Maximum amount of players to get
+
+        Returns:
+            List of (steamid, name, score) tuples, highest first
+        """
+
+        return [
+            (steamid, self._names[steamid], self._scores[steamid])
+            for _, steamid in self._order[:count]
+        ]
+
+
+# ======================================================================
+# >> GLOBALS
+# ======================================================================
+
+# Players ranked by gold, and heroes ranked by (level, exp) per hero cid
+_gold_ranking = Ranking()
+_hero_rankings = {}
+
+# Steamids of the players on the server, kept over the refreshes
+_online = set()
+
+# Future of the rows being fetched, and when the latest fetch started
+_pending = None
+_last_refresh = None
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def _negate(score):
+    """Negates a score for sorting it into descending order."""
+
+    return tuple(-value for value in score)
+
+
+def get_ranking(hero_cid=None):
+    """Gets a ranking, applying the latest refresh first.
+
+    Args:
+        hero_cid: Class id of the hero whose ranking to get,
+            None for the players' gold ranking
+
+    Returns:
+        The Ranking object
+    """
+
+    _apply_refresh()
+    if hero_cid is None:
+        return _gold_ranking
+    return _hero_rankings.setdefault(hero_cid, Ranking())
+
+
+def refresh(force=False):
+    """Starts reloading the rankings from the database.
+
+    The rows are fetched on a worker thread and applied by the next
+    call to get_ranking() or refresh() after they've arrived. Does
+    nothing if leaderboard_refresh_interval seconds haven't passed
+    since the previous reload.
+
+    Args:
+        force: Reload even if the interval hasn't passed
+    """
+
+    global _pending, _last_refresh
+    _apply_refresh()
+    if _pending is not None:
+        return
+    if (not force and _last_refresh is not None and
+            time.monotonic() - _last_refresh < leaderboard_refresh_interval):
+        return
+    _last_refresh = time.monotonic()
+    _pending = hw.database.fetch_leaderboards(
+        [hero_cls.cid for hero_cls in Hero.get_subclasses()],
+        leaderboard_size
+    )
+
+
+def _apply_refresh():
+    """Replaces the rankings with the fetched rows if they've arrived.
+
+    Online players' entries are carried over from the old rankings,
+    since they're more recent than the rows in the database.
+    """
+
+    global _pending, _gold_ranking, _hero_rankings
+    if _pending is None or not _pending.done():
+        return
+    future, _pending = _pending, None
+    if future.exception() is not None:
+        return
+    player_rows, hero_rows = future.result()
+
+    # Rebuild the gold ranking
+    gold_ranking = Ranking()
+    for steamid, name, gold in player_rows:
+        gold_ranking.update(steamid, name or steamid, (gold, ))
+    _carry_over(_gold_ranking, gold_ranking)
+    _gold_ranking = gold_ranking
+
+    # Rebuild the hero rankings
+    hero_rankings = {}
+    for cid, rows in hero_rows.items():
+        ranking = hero_rankings[cid] = Ranking()
+        for steamid, name, level, exp in rows:
+            ranking.update(steamid, name or steamid, (level, exp))
+    for cid, old_ranking in _hero_rankings.items():
+        _carry_over(old_ranking, hero_rankings.setdefault(cid, Ranking()))
+    _hero_rankings = hero_rankings
+
+
+def _carry_over(old_ranking, new_ranking):
+    """Copies online players' entries from a ranking to another."""
+
+    for steamid in _online:
+        entry = old_ranking.get(steamid)
+        if entry is not None:
+            new_ranking.update(steamid, *entry)
+
+
+def add_player(player):
+    """Ranks a joined player's gold and all of his heroes.
+
+    Args:
+        player: Player who joined the server
+    """
+
+    _online.add(player.steamid)
+    update_gold(player)
+    for hero in player.heroes:
+        update_hero(player, hero)
+
+
+def remove_player(steamid):
+    """Stops carrying a player's entries over the refreshes.
+
+    His entries stay ranked until the next refresh, which loads his
+    saved data from the database.
+
+    Args:
+        steamid: Steamid of the player who left the server
+    """
+
+    _online.discard(steamid)
+
+
+def update_gold(player):
+    """Updates player's rank in the gold ranking.
+
+    Args:
+        player: Player whose gold has changed
+    """
+
+    _gold_ranking.update(player.steamid, player.name, (player.gold, ))
+
+
+def update_hero(player, hero):
+    """Updates hero's rank in its hero ranking.
+
+    Args:
+        player: Owner of the hero
+        hero: Hero whose level or exp has changed
+    """
+
+    _hero_rankings.setdefault(hero.cid, Ranking()).update(
+        player.steamid, player.name, (hero.level, hero.exp))
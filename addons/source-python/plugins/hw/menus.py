@@ -3,19 +3,25 @@
 # ======================================================================
 
 # Hero-Wars
-from hw.tools import find_element
 from hw.tools import find_elements
 from hw.tools import split_string
 
 from hw.tools import shiftattr
 
 from hw.configs import admins
-
 from hw.entities import Hero
 from hw.entities import Item
 
 from hw.player import Player
 
+from hw.database import save_player_data
+from hw.database import save_hero_data
+
+from hw.leaderboard import get_ranking
+from hw.leaderboard import update_hero
+
+from hw.configs import leaderboard_size
+
 # Source.Python
 from menus import PagedMenu as SpPagedMenu
 from menus import SimpleMenu
@@ -319,6 +325,7 @@ def _current_hero_select_callback(menu, player_index, choice):
                 skill.required_level <= player.hero.level and
                 (skill.max_level is None or skill.level < skill.max_level)):
             skill.level += 1
+    save_player_data(player)
     return menu
 
 
@@ -403,7 +410,7 @@ def _owned_heroes_select_callback(menu, player_index, choice):
     """Owned Heroes menu's select_callback function."""
 
     next_menu = HeroMenu(
-        choice.value,
+        Player(player_index).materialize_hero(choice.value),
         select_callback=_hero_owned_info_select_callback,
         build_callback=_hero_owned_info_build_callback,
         constants={7: PagedOption(_TR['Change'], 7)},
@@ -495,6 +502,7 @@ def _buy_items_select_callback(menu, player_index, choice):
     player = Player(player_index)
     player.hero.items.append(choice.value())
     player.cash -= choice.value.cost
+    save_player_data(player)
 
 
 def _buy_items_build_callback(menu, player_index):
@@ -537,6 +545,7 @@ def _sell_items_select_callback(menu, player_index, choice):
     player = Player(player_index)
     player.hero.items.remove(choice.value)
     player.cash += choice.value.sell_value
+    save_player_data(player)
 
 
 def _sell_items_build_callback(menu, player_index):
@@ -576,9 +585,10 @@ def _buy_hero_categories_build_callback(menu, player_index):
 
     player = Player(player_index)
     menu.entities = []
+    owned = {hero.cid for hero in player.heroes}
 
     for hero_cls in Hero.get_subclasses():
-        if find_element(player.heroes, 'cid', hero_cls.cid):
+        if hero_cls.cid in owned:
             continue
         elif (hero_cls.allowed_players
                 and player.steamid not in hero_cls.allowed_players):
@@ -661,6 +671,7 @@ def _hero_buy_info_select_callback(menu, player_index, choice):
             player.gold -= hero.cost
             player.heroes.append(hero)
             player.hero = hero
+            save_player_data(player)
 
 
 def _hero_buy_info_build_callback(menu, player_index):
@@ -711,7 +722,9 @@ def _hero_buy_info_build_callback(menu, player_index):
 def _hero_owned_info_select_callback(menu, player_index, choice):
     """Hero Owned Info menu's select_callback function."""
     if choice.value == 7:
-        Player(player_index).hero = menu.hero
+        player = Player(player_index)
+        player.hero = menu.hero
+        save_player_data(player)
 
 
 def _hero_owned_info_build_callback(menu, player_index):
@@ -804,6 +817,14 @@ def _shift_attr_select_callback(menu, player_index, choice):
     """Shift Attr menu's select_callback function."""
 
     shiftattr(menu.obj, menu.attr_name, choice.value)
+
+    # Queue the changed player or hero to be saved and rerank it, the
+    # gold ranking is updated by Player's gold setter
+    if isinstance(menu.obj, Player):
+        save_player_data(menu.obj)
+    elif menu.obj.owner is not None:
+        save_hero_data(menu.obj.owner.steamid, menu.obj)
+        update_hero(menu.obj.owner, menu.obj)
     return menu
 
 
@@ -944,6 +965,80 @@ menus['Admin'] = SimpleMenu(
 )
 
 
+# ======================================================================
+# >> LEADERBOARDS MENU
+# ======================================================================
+
+def _leaderboards_select_callback(menu, player_index, choice):
+    """Leaderboards menu's select_callback function."""
+
+    next_menu = HeroMenu(
+        choice.value,
+        build_callback=_leaderboard_build_callback,
+        previous_menu=menu
+    )
+    return next_menu
+
+
+def _leaderboards_build_callback(menu, player_index):
+    """Leaderboards menu's build_callback function."""
+
+    menu.clear()
+    menu.append(PagedOption(_TR['Richest Players'], None))
+    for hero_cls in Hero.get_subclasses():
+        menu.append(PagedOption(hero_cls.name, hero_cls))
+
+
+menus['Leaderboards'] = PagedMenu(
+    title=_TR['Leaderboards'],
+    select_callback=_leaderboards_select_callback,
+    build_callback=_leaderboards_build_callback
+)
+
+
+# ======================================================================
+# >> LEADERBOARD MENU
+# ======================================================================
+
+def _leaderboard_build_callback(menu, player_index):
+    """Leaderboard menu's build_callback function.
+
+    Shows the in-memory ranking of menu's hero, or the gold ranking
+    if there's no hero.
+    """
+
+    player = Player(player_index)
+    menu.clear()
+
+    # Gold ranking
+    if menu.hero is None:
+        menu.title = _TR['Richest Players']
+        ranking = get_ranking()
+        line = _TR['Gold Rank']
+        for rank, (steamid, name, (gold, )) in enumerate(
+                ranking.top(leaderboard_size), 1):
+            menu.append(Text(line.get_string(rank=rank, name=name, gold=gold)))
+
+    # Hero ranking
+    else:
+        menu.title = menu.hero.name
+        ranking = get_ranking(menu.hero.cid)
+        line = _TR['Hero Rank']
+        for rank, (steamid, name, (level, exp)) in enumerate(
+                ranking.top(leaderboard_size), 1):
+            menu.append(Text(line.get_string(
+                rank=rank, name=name, level=level, exp=exp)))
+
+    # Show the player his own rank, which is only known within the
+    # leaderboard rows loaded from the database
+    rank = ranking.rank(player.steamid)
+    if rank is None:
+        rank = '-'
+    elif rank > leaderboard_size:
+        rank = '>{0}'.format(leaderboard_size)
+    menu.description = _TR['Your Rank'].get_string(rank=rank)
+
+
 # ======================================================================
 # >> MAIN MENU
 # ======================================================================
@@ -971,6 +1066,7 @@ menus['Main'] = SimpleMenu(
         SimpleOption(4, _TR['Sell Items'], menus['Sell Items']),
         SimpleOption(5, _TR['Buy Items'], menus['Item Buy Categories']),
         SimpleOption(6, _TR['Playerinfo'], menus['Playerinfo Choose']),
+        SimpleOption(7, _TR['Leaderboards'], menus['Leaderboards']),
         SimpleOption(0, _TR['Close'])
     ],
     select_callback=_main_select_callback,
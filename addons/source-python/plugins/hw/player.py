@@ -6,13 +6,28 @@
 from hw.database import save_player_data
 from hw.database import load_player_data
 from hw.database import save_hero_data
+from hw.database import flush
+from hw.database import prefetch_player_data
+from hw.database import discard_prefetched
+from hw.database import register_loaded_steamids
 
 from hw.entities import Hero
+from hw.entities import HeroRecord
+
+from hw.leaderboard import add_player
+from hw.leaderboard import remove_player
+from hw.leaderboard import update_gold
+
+from hw.gameevents import set_active_hero
+from hw.gameevents import remove_active_hero
 
 from hw.tools import find_element
+from hw.tools import LRUCache
 
 from hw.configs import starting_heroes
 from hw.configs import player_entity_class
+from hw.configs import reconnect_cache_size
+from hw.configs import reconnect_cache_ttl
 
 # Source.Python
 from players.helpers import index_from_userid
@@ -22,9 +37,13 @@ from memory.hooks import HookType
 
 from entities import TakeDamageInfo
 from entities.helpers import index_from_pointer
+from entities.helpers import edict_from_pointer
+from entities.helpers import inthandle_from_pointer
 
 from events import Event
 
+from listeners import LevelShutdown
+
 from weapons.entity import WeaponEntity
 
 from engines.server import engine_server
@@ -34,30 +53,136 @@ from engines.server import engine_server
 # >> GLOBALS
 # ======================================================================
 
+# Players' PlayerState objects keyed by their userids
 _player_data = {}
 _is_hooked = False
 
+# Data of recently disconnected players keyed by their steamids
+reconnect_cache = LRUCache(reconnect_cache_size, reconnect_cache_ttl)
+
+# Amounts of OnTakeDamage hook calls, and calls returned from early
+# because no skill listens to them
+damage_hook_stats = {
+    'calls': 0,
+    'skipped': 0
+}
+
+# Classnames of weapons keyed by their inthandles, which unlike indexes
+# don't get reused by other entities
+_weapon_classnames = {}
+_WEAPON_CLASSNAMES_MAX = 4096
+
+# Player objects keyed by their indexes, and indexes keyed by userids
+_players = {}
+_userids = {}
+
 
 # ======================================================================
 # >> GAME EVENTS
 # ======================================================================
 
+@Event
+def player_connect(game_event):
+    """Starts loading player's data upon connect.
+
+    Not needed if the player's data is still in the reconnect cache.
+    """
+
+    # Forget the previous player on the same index
+    _players.pop(game_event.get_int('index') + 1, None)
+
+    steamid = game_event.get_string('networkid')
+    if steamid not in reconnect_cache:
+        prefetch_player_data(steamid)
+
+
 @Event
 def player_disconnect(game_event):
-    """Saves player's data upon disconnect."""
+    """Saves player's data upon disconnect.
+
+    The data is also kept in the reconnect cache for a while, except
+    for bots who all share the same steamid.
+    """
 
     userid = game_event.get_int('userid')
     player = Player.from_userid(userid)
+
+    # Forget the rows prefetched with a steamid the player didn't get
+    discard_prefetched(game_event.get_string('networkid'))
+
+    # Always save the player's row to update his last seen time
+    player.dirty = True
     save_player_data(player)
-    del _player_data[userid]
+    flush()
+    remove_player(player.steamid)
+    remove_active_hero(userid)
+    state = _player_data.pop(userid)
+    if player.steamid != 'BOT':
 
+        # Non-permanent items don't survive a reconnect
+        for hero in state.heroes:
+            if not isinstance(hero, HeroRecord):
+                hero.items[:] = [
+                    item for item in hero.items if item.permanent]
+        reconnect_cache.put(player.steamid, state)
+    _players.pop(_userids.pop(userid, None), None)
 
-@Event
-def player_spawn(game_event):
-    """Saves player's data upon spawning."""
 
-    player = Player.from_userid(game_event.get_int('userid'))
-    save_player_data(player)
+# ======================================================================
+# >> LISTENERS
+# ======================================================================
+
+@LevelShutdown
+def level_shutdown():
+    """Forgets the cached Player objects and weapon classnames.
+
+    The entities they refer to are recreated with the map. Also forgets
+    the prefetched rows no player has loaded.
+    """
+
+    discard_prefetched()
+    _players.clear()
+    _userids.clear()
+    _weapon_classnames.clear()
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def _get_weapon_classname(pointer):
+    """Gets a weapon's classname without wrapping the weapon entity.
+
+    Args:
+        pointer: Pointer to the weapon
+
+    Returns:
+        The weapon's classname
+    """
+
+    inthandle = inthandle_from_pointer(pointer)
+    classname = _weapon_classnames.get(inthandle)
+    if classname is None:
+        if len(_weapon_classnames) >= _WEAPON_CLASSNAMES_MAX:
+            _weapon_classnames.clear()
+        classname = _weapon_classnames[inthandle] = (
+            edict_from_pointer(pointer).get_class_name())
+    return classname
+
+
+@register_loaded_steamids
+def _get_loaded_steamids():
+    """Gets the steamids of the players whose data is in memory.
+
+    Called from the database maintenance thread, which must not archive
+    the online players nor the ones in the reconnect cache.
+
+    Returns:
+        List of the steamids
+    """
+
+    states = list(_player_data.values())
+    return [state.steamid for state in states] + reconnect_cache.keys()
 
 
 # ======================================================================
@@ -70,16 +195,25 @@ def _weapon_bump(args):
     requested to be picked up in game.
     """
 
-    player_index = index_from_pointer(args[0])
-    weapon_index = index_from_pointer(args[1])
-    weapon = WeaponEntity(weapon_index)
-    player = Player(player_index)
-    eargs = {'weapon': weapon, 'player': player}
-    if weapon.classname in player.restrictions:
-        player.hero.execute_skills('weapon_pickup_fail', **eargs)
+    player = Player(index_from_pointer(args[0]))
+    hero = player.hero
+
+    # Nothing to do for an unrestricted player without pickup skills
+    if not player.restrictions and not hero.listens_to('weapon_pickup'):
+        return
+
+    # Block the pickup of a restricted weapon
+    if _get_weapon_classname(args[1]) in player.restrictions:
+        if hero.listens_to('weapon_pickup_fail'):
+            hero.execute_skills(
+                'weapon_pickup_fail', player=player,
+                weapon=WeaponEntity(index_from_pointer(args[1])))
         return False
-    else:
-        player.hero.execute_skills('weapon_pickup', **eargs)
+
+    if hero.listens_to('weapon_pickup'):
+        hero.execute_skills(
+            'weapon_pickup', player=player,
+            weapon=WeaponEntity(index_from_pointer(args[1])))
 
 
 def _on_take_damage(args):
@@ -88,17 +222,32 @@ def _on_take_damage(args):
     entity takes damage.
     """
 
+    damage_hook_stats['calls'] += 1
     player_index = index_from_pointer(args[0])
     info = make_object(TakeDamageInfo, args[1])
+    if player_index == info.attacker:
+        damage_hook_stats['skipped'] += 1
+        return
+
+    # Return right away if neither hero has skills for the damage
     defender = Player(player_index)
     attacker = None if not info.attacker else Player(info.attacker)
+    defends = defender.hero.listens_to('player_pre_defend')
+    attacks = (
+        attacker is not None and
+        attacker.hero.listens_to('player_pre_attack'))
+    if not defends and not attacks:
+        damage_hook_stats['skipped'] += 1
+        return
+
     eargs = {
         'attacker': attacker,
         'defender': defender,
         'info': info
     }
-    if not player_index == info.attacker:
+    if defends:
         defender.hero.execute_skills('player_pre_defend', **eargs)
+    if attacks:
         attacker.hero.execute_skills('player_pre_attack', **eargs)
 
 
@@ -106,13 +255,63 @@ def _on_take_damage(args):
 # >> CLASSES
 # ======================================================================
 
-class Player(player_entity_class):
+class PlayerState(object):
+    """Hero-Wars data of a player, shared by his Player objects.
+
+    Kept in _player_data while the player is on the server, and in the
+    reconnect cache after he has left.
+
+    Attributes:
+        steamid: Player's steamid
+        gold: Player's Hero-Wars gold
+        hero: Player's hero currently in use
+        heroes: List of owned heroes, HeroRecords for unused heroes
+        restrictions: Set of player's restricted weapons
+        dirty: Have gold or hero changed since they were last saved
+    """
+
+    __slots__ = ('steamid', 'gold', 'hero', 'heroes', 'restrictions', 'dirty')
+
+    def __init__(self, steamid):
+        """Initializes a new player's empty data.
+
+        Args:
+            steamid: Player's steamid
+        """
+
+        self.steamid = steamid
+        self.gold = 0
+        self.hero = None
+        self.heroes = []
+        self.restrictions = set()
+        self.dirty = True
+
+
+class _PlayerMeta(type(player_entity_class)):
+    """Metaclass which reuses the Player objects of each index.
+
+    Player(index) returns the cached object if there is one, so the
+    entity is only wrapped once per player and map. The cache is
+    emptied of players who disconnect and upon map change.
+    """
+
+    def __call__(cls, index):
+        """Gets the Player object of an index, creating it if needed."""
+
+        player = _players.get(index)
+        if player is None:
+            player = _players[index] = super().__call__(index)
+        return player
+
+
+class Player(player_entity_class, metaclass=_PlayerMeta):
     """Player class for Hero-Wars related activity and data.
 
     Attributes:
         gold: Player's Hero-Wars gold, used to purchase heroes and items
         hero: Player's hero currently in use
-        heroes: List of owned heroes
+        heroes: List of owned heroes, HeroRecords for unused heroes
+        dirty: Have gold or hero changed since they were last saved
     """
 
     @classmethod
@@ -123,7 +322,10 @@ class Player(player_entity_class):
             userid: Userid of the player
         """
 
-        return cls(index_from_userid(userid))
+        index = _userids.get(userid)
+        if index is None:
+            index = _userids[userid] = index_from_userid(userid)
+        return cls(index)
 
     def __init__(self, index):
         """Initializes a new player instance.
@@ -133,30 +335,46 @@ class Player(player_entity_class):
         """
 
         super().__init__(index)
-
-        # Create player's data dict
-        if self.userid not in _player_data:
-            _player_data[self.userid] = {
-                'gold': 0,
-                'hero': None,
-                'heroes': [],
-                'restrictions': set()
-            }
+        userid = self.userid
+        self._state = _player_data.get(userid)
+
+        # Get player's data from the reconnect cache
+        if self._state is None and self.steamid != 'BOT':
+            self._state = reconnect_cache.pop(self.steamid)
+            if self._state is not None:
+                self._state.restrictions.clear()
+                _player_data[userid] = self._state
+                add_player(self)
+                set_active_hero(userid, self._state.hero)
+
+        # Or create player's data
+        if self._state is None:
+            self._state = _player_data[userid] = PlayerState(self.steamid)
 
             # Load player's data
             load_player_data(self)
 
             # Make sure the player gets his starting heroes
-            heroes = Hero.get_subclasses()
             for cid in starting_heroes:
-                hero_cls = find_element(heroes, 'cid', cid)
+                hero_cls = Hero.from_cid(cid)
                 if hero_cls and not find_element(self.heroes, 'cid', cid):
-                    self.heroes.append(hero_cls())
+                    self.heroes.append(HeroRecord(cid))
 
             # Make sure the player has a hero
             if not self.hero:
                 self.hero = self.heroes[0]
 
+            # Update his last seen time
+            save_player_data(self)
+
+            # Rank the player on the leaderboards
+            add_player(self)
+
+        # Make the heroes refer to this Player object
+        for hero in self.heroes:
+            if not isinstance(hero, HeroRecord):
+                hero.owner = self
+
         # Hooks :3
         global _is_hooked
         if _is_hooked is False:
@@ -172,7 +390,7 @@ class Player(player_entity_class):
             Player's gold
         """
 
-        return _player_data[self.userid]['gold']
+        return self._state.gold
 
     @gold.setter
     def gold(self, gold):
@@ -184,7 +402,9 @@ class Player(player_entity_class):
 
         if gold < 0:
             raise ValueError('Attempt to set negative gold for a player.')
-        _player_data[self.userid]['gold'] = gold
+        self._state.gold = gold
+        self.dirty = True
+        update_gold(self)
 
     @property
     def hero(self):
@@ -194,17 +414,19 @@ class Player(player_entity_class):
             Player's hero
         """
 
-        return _player_data[self.userid]['hero']
+        return self._state.hero
 
     @hero.setter
     def hero(self, hero):
         """Setter for player's current hero.
 
         Makes sure player owns the hero and saves his current hero to
-        the database before switching to the new one.
+        the database before switching to the new one. The new hero is
+        materialized if it's a HeroRecord, and the other heroes are
+        stored as records unless they have permanent items.
 
         Args:
-            hero: Hero to switch to
+            hero: Hero or HeroRecord to switch to
 
         Raises:
             ValueError: Hero not owned by the player
@@ -221,25 +443,57 @@ class Player(player_entity_class):
             return
 
         # If player has a current hero
-        if self.hero:
+        old_hero = self.hero
+        if old_hero:
 
             # Save current hero's data
-            save_hero_data(self.steamid, self.hero)
+            save_hero_data(self.steamid, old_hero)
 
             # Destroy current hero's items
-            for item in self.hero.items:
+            for item in old_hero.items:
                 if not item.permanent:
-                    self.hero.items.remove(item)
+                    old_hero.items.remove(item)
 
             # Slay the player
             engine_server.client_command(self.edict, 'kill', True)
 
         # Change to the new hero
-        _player_data[self.userid]['hero'] = hero
+        hero = self.materialize_hero(hero)
+        self._state.hero = hero
+        hero.owner = self
+        self.dirty = True
+        set_active_hero(self.userid, hero)
 
         # Reset current restrictions
         self.restrictions.clear()
 
+        # Store the unused heroes as records
+        for index, owned in enumerate(self.heroes):
+            if (owned is not hero and not isinstance(owned, HeroRecord)
+                    and not owned.items):
+                save_hero_data(self.steamid, owned)
+                self.heroes[index] = HeroRecord.from_hero(owned)
+                owned.owner = None
+
+    def materialize_hero(self, hero):
+        """Makes sure an owned hero is a Hero object.
+
+        A HeroRecord gets replaced with a Hero object in the player's
+        heroes.
+
+        Args:
+            hero: Player's Hero or HeroRecord
+
+        Returns:
+            The Hero object
+        """
+
+        if isinstance(hero, HeroRecord):
+            index = self.heroes.index(hero)
+            hero = self.heroes[index] = hero.materialize()
+            hero.owner = self
+        return hero
+
     @property
     def heroes(self):
         """Getter for player's heroes.
@@ -248,7 +502,23 @@ class Player(player_entity_class):
             A list of player's heroes.
         """
 
-        return _player_data[self.userid]['heroes']
+        return self._state.heroes
+
+    @property
+    def dirty(self):
+        """Getter for player's dirty flag.
+
+        Returns:
+            True if player's gold or hero has changed since last save
+        """
+
+        return self._state.dirty
+
+    @dirty.setter
+    def dirty(self, dirty):
+        """Setter for player's dirty flag."""
+
+        self._state.dirty = dirty
 
     @property
     def restrictions(self):
@@ -258,7 +528,7 @@ class Player(player_entity_class):
             A set of player's restricted weapons
         """
 
-        return _player_data[self.userid]['restrictions']
+        return self._state.restrictions
 
     @restrictions.setter
     def restrictions(self, restrictions):
@@ -0,0 +1,138 @@
+# ======================================================================
+# >> IMPORTS
+# ======================================================================
+
+# Hero-Wars
+from hw.events import Hero_Level_Up
+from hw.events import Player_Ultimate
+
+# Source.Python
+from events.manager import event_manager
+
+
+# ======================================================================
+# >> ALL DECLARATION
+# ======================================================================
+
+__all__ = (
+    'Signal',
+    'hero_level_up',
+    'player_ultimate'
+)
+
+
+# ======================================================================
+# >> CLASSES
+# ======================================================================
+
+class Signal(object):
+    """Internal Hero-Wars event dispatched to Python callbacks.
+
+    Callbacks are called synchronously, in the order they were
+    connected, with the signal's arguments as keyword arguments. The
+    arguments are passed as they are, so callbacks get the actual
+    Player and Hero objects instead of indexes and ids to look up.
+
+    A signal can be mirrored to an engine event for other plugins.
+    The engine event is only fired while something is registered for
+    it, so Hero-Wars alone never goes through the engine.
+
+    Attributes:
+        name: Name of the signal and of its engine event
+        arg_names: Names of the arguments the signal is emitted with
+    """
+
+    def __init__(self, name, arg_names, mirror=None):
+        """Initializes a new signal.
+
+        Args:
+            name: Name of the signal and of its engine event
+            arg_names: Names of the arguments the signal is emitted with
+            mirror: Function creating the engine event from the
+                signal's arguments, None to never fire one
+        """
+
+        self.name = name
+        self.arg_names = frozenset(arg_names)
+        self._mirror = mirror
+        self._callbacks = []
+
+    def connect(self, callback):
+        """Connects a callback to the signal.
+
+        Can also be used as a decorator.
+
+        Args:
+            callback: Function to call with the signal's arguments
+
+        Returns:
+            The callback
+        """
+
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+        return callback
+
+    def disconnect(self, callback):
+        """Disconnects a callback from the signal.
+
+        Args:
+            callback: Previously connected function
+        """
+
+        self._callbacks.remove(callback)
+
+    def emit(self, **kwargs):
+        """Calls the connected callbacks with the arguments.
+
+        Fires the mirrored engine event after the callbacks, if any
+        listeners are registered for it.
+
+        Raises:
+            TypeError: If the arguments don't match arg_names
+        """
+
+        if kwargs.keys() != self.arg_names:
+            raise TypeError('{0} takes arguments {1}, got {2}.'.format(
+                self.name, sorted(self.arg_names), sorted(kwargs)))
+
+        # Iterate a copy, callbacks may connect or disconnect others
+        for callback in tuple(self._callbacks):
+            callback(**kwargs)
+
+        if self._mirror is not None and event_manager.get(self.name):
+            self._mirror(**kwargs).fire()
+
+
+# ======================================================================
+# >> FUNCTIONS
+# ======================================================================
+
+def _hero_level_up_event(player, hero):
+    """Creates the Hero_Level_Up engine event."""
+
+    return Hero_Level_Up(
+        cid=hero.cid,
+        id=str(id(hero)),
+        player_index=player.index,
+        player_userid=player.userid
+    )
+
+
+def _player_ultimate_event(player):
+    """Creates the Player_Ultimate engine event."""
+
+    return Player_Ultimate(index=player.index, userid=player.userid)
+
+
+# ======================================================================
+# >> SIGNALS
+# ======================================================================
+
+# Emitted with the owner and the hero when his current hero levels up
+hero_level_up = Signal(
+    'hero_level_up', ('player', 'hero'), _hero_level_up_event)
+
+# Emitted with the player when he uses his ultimate
+player_ultimate = Signal(
+    'player_ultimate', ('player', ), _player_ultimate_event)
@@ -2,14 +2,21 @@
 # >> IMPORTS
 # ======================================================================
 
+# Hero-Wars
+from hw.cooldowns import start_cooldown
+from hw.cooldowns import get_cooldown
+
 # Python
 from random import randint
 
 from functools import wraps, WRAPPER_ASSIGNMENTS
 
-# Source.Python
-from listeners.tick.repeat import TickRepeat
+from collections import OrderedDict
 
+import math
+import time
+
+# Source.Python
 from messages import SayText2
 
 
@@ -31,6 +38,86 @@ class classproperty(object):
         return self.getter(owner)
 
 
+class LRUCache(object):
+    """A bounded cache dropping its least recently stored entries.
+
+    Entries also expire after ttl seconds.
+
+    Attributes:
+        maxsize: Maximum amount of entries
+        ttl: Seconds before an entry expires, None for never
+        hits: Amount of successful lookups
+        misses: Amount of lookups for missing or expired entries
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        """Initializes a new cache.
+
+        Args:
+            maxsize: Maximum amount of entries
+            ttl: Seconds before an entry expires, None for never
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry):
+        """Checks if an entry has expired."""
+
+        return self.ttl is not None and time.monotonic() - entry[0] > self.ttl
+
+    def put(self, key, value):
+        """Stores a value into the cache.
+
+        Args:
+            key: Key of the value
+            value: Value to store
+        """
+
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic(), value)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Removes a value from the cache and returns it.
+
+        Args:
+            key: Key of the value
+            default: Returned if the value is missing or has expired
+
+        Returns:
+            The value or default
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None or self._expired(entry):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[1]
+
+    def keys(self):
+        """Gets a list of the keys, including the expired ones."""
+
+        return list(self._entries)
+
+    def clear(self):
+        """Removes all the entries."""
+
+        self._entries.clear()
+
+
 # ======================================================================
 # >> FUNCTIONS
 # ======================================================================
@@ -186,6 +273,8 @@ def cooldownf(fn, message=None):
     Decorator function for easily adding cooldown as a dynamic time
     (function) into skill's methods. The function gets called when the
     cooldown is needed, and the skill is passed to the function.
+    Cooldowns are kept by hw.cooldowns per player, who is taken from
+    the method's player argument, or the skill's owner if there's none.
 
     Args:
         fn: Function to determine the cooldown of the method
@@ -202,11 +291,20 @@ def cooldownf(fn, message=None):
         @wraps(method, assigned=WRAPPER_ASSIGNMENTS+('__dict__',), updated=())
         def method_wrapper(self, **eargs):
 
+            # Get the player using the skill, or else the skill's owner
+            player = eargs.get('player')
+            if player is None:
+                player = self.hero.owner
+            cooldown = get_cooldown(
+                player.userid, type(self), method.__name__)
+
             # If the method's cooldown is over
-            if method_wrapper.cooldown.remaining <= 0:
+            if cooldown is None:
 
                 # Restart the cooldown
-                method_wrapper.cooldown.start(1, fn(self, **eargs))
+                start_cooldown(
+                    player.userid, type(self), method.__name__,
+                    fn(self, **eargs))
 
                 # And call the function
                 return method(self, **eargs)
@@ -217,19 +315,16 @@ def cooldownf(fn, message=None):
                 # Format the provided message
                 formatted_message = message.format(
                     name=self.name,
-                    cd=method_wrapper.cooldown.remaining,
-                    max_cd=method_wrapper.cooldown.limit
+                    cd=math.ceil(cooldown[0]),
+                    max_cd=cooldown[1]
                 )
 
                 # And send it to the player
-                SayText2(message=formatted_message).send(eargs['player'].index)
+                SayText2(message=formatted_message).send(player.index)
 
                 # And exit with code 3
                 return 3
 
-        # Create the cooldown object for the wrapper
-        method_wrapper.cooldown = TickRepeat(lambda: None)
-
         # And return the wrapper
         return method_wrapper
 
@@ -0,0 +1,9 @@
+"""Makes hw importable in the tests, see tools/standalone.py."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+import standalone  # noqa: E402,F401
@@ -0,0 +1,89 @@
+"""Tests of the maintenance's archiving of inactive players."""
+
+import os
+import time
+
+import pytest
+
+from hw.backends import SQLiteBackend
+import hw.database
+import hw.player
+
+
+OLD = int(time.time()) - 100 * 86400
+
+
+@pytest.fixture
+def backend(tmpdir, monkeypatch):
+    """SQLite backend with three players last seen 100 days ago."""
+
+    backend = SQLiteBackend(str(tmpdir.join('hw.db')), 'default', False)
+    backend.setup()
+    backend.write_rows(
+        [(steamid, 10, 'Hero', OLD, steamid)
+         for steamid in ('ONLINE', 'RECONNECTING', 'GONE')],
+        [(steamid, 'Hero', 5, 50)
+         for steamid in ('ONLINE', 'RECONNECTING', 'GONE')],
+        []
+    )
+    monkeypatch.setattr(hw.database, 'backend', backend)
+    monkeypatch.setattr(hw.database, 'archive_inactive_days', 30)
+    monkeypatch.setattr(
+        hw.database, 'archive_path', str(tmpdir.join('archive.db')))
+    yield backend
+    backend.close()
+
+
+def run_archive():
+    """Runs the maintenance steps up to the end of the archiving."""
+
+    for task in hw.database._maintenance_steps():
+        if task not in ('compact', 'archive'):
+            break
+
+
+def test_online_players_are_not_archived(backend, monkeypatch):
+    online = hw.player.PlayerState('ONLINE')
+    monkeypatch.setitem(hw.player._player_data, 2, online)
+    hw.player.reconnect_cache.put(
+        'RECONNECTING', hw.player.PlayerState('RECONNECTING'))
+    try:
+        run_archive()
+    finally:
+        hw.player.reconnect_cache.clear()
+
+    for steamid in ('ONLINE', 'RECONNECTING'):
+        player_row, hero_rows, _ = backend.fetch_player_rows(steamid)
+        assert player_row == (10, 'Hero')
+        assert hero_rows == [('Hero', 5, 50, None)]
+    assert backend.fetch_player_rows('GONE') == (None, [], [])
+    assert os.path.exists(hw.database.archive_path)
+
+
+def test_excluded_players_do_not_stall_the_batches(backend):
+    moved = backend.archive_players(
+        int(time.time()), hw.database.archive_path, batch_size=1,
+        exclude={'ONLINE', 'RECONNECTING'})
+    assert moved == 1
+    assert backend.fetch_player_rows('GONE')[0] is None
+
+
+def test_loading_marks_the_player_row_for_saving():
+    player = hw.player.PlayerState('ONLINE')
+    player.dirty = False
+    hw.database._build_player_data(player, (10, None), [], [])
+    assert player.dirty
+
+
+def test_archived_player_is_restored_on_load(backend):
+    run_archive()
+    assert backend.fetch_player_rows('GONE')[0] is None
+
+    player = hw.player.PlayerState('GONE')
+    hw.database._build_player_data(
+        player, *hw.database._fetch_player_rows('GONE'))
+    assert player.gold == 10
+    assert backend.fetch_player_rows('GONE')[1] == [('Hero', 5, 50, None)]
+
+    # Restored players aren't left in the archive
+    assert not backend.restore_player('GONE', hw.database.archive_path)
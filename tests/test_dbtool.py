@@ -0,0 +1,66 @@
+"""Tests of the hw_db export and import."""
+
+import pytest
+
+import benchutil
+
+from hw.backends import SQLiteBackend
+import hw.database
+import hw.dbtool
+
+
+HERO_CLS, = benchutil.make_catalog(1, 2)
+SKILL_CIDS = [skill.cid for skill in HERO_CLS.skill_set]
+
+
+@pytest.fixture
+def exported(tmpdir, monkeypatch):
+    """Path of a database exported with a hero unknown to the server."""
+
+    backend = SQLiteBackend(str(tmpdir.join('old.db')), 'default', False)
+    backend.setup()
+    backend.write_rows(
+        [('STEAM_0:0:1', 25, HERO_CLS.cid, 1000, 'Player')],
+        [('STEAM_0:0:1', HERO_CLS.cid, 4, 60),
+         ('STEAM_0:0:1', 'RemovedHero', 2, 10)],
+        [('STEAM_0:0:1', HERO_CLS.cid, SKILL_CIDS[0], 3),
+         ('STEAM_0:0:1', HERO_CLS.cid, 'RemovedSkill', 1),
+         ('STEAM_0:0:1', 'RemovedHero', 'RemovedSkill', 2)]
+    )
+    monkeypatch.setattr(hw.database, 'backend', backend)
+    path = str(tmpdir.join('hw.jsonl'))
+    exported, skipped = hw.dbtool.export_database(path, chunk_size=1)
+    backend.close()
+
+    assert exported == {'players': 1, 'heroes': 1, 'skills': 1}
+    assert skipped == {
+        'RemovedHero': 1,
+        '{0}.RemovedSkill'.format(HERO_CLS.cid): 1,
+        'RemovedHero.RemovedSkill': 1
+    }
+    return path
+
+
+@pytest.mark.parametrize('packed', (False, True))
+def test_export_round_trip(exported, tmpdir, monkeypatch, packed):
+    backend = SQLiteBackend(str(tmpdir.join('new.db')), 'default', packed)
+    backend.setup()
+    monkeypatch.setattr(hw.database, 'backend', backend)
+    try:
+        imported, skipped = hw.dbtool.import_database(exported, chunk_size=2)
+        assert imported == {'players': 1, 'heroes': 1, 'skills': 1}
+        assert not skipped
+
+        player_row, hero_rows, skill_rows = backend.fetch_player_rows(
+            'STEAM_0:0:1')
+        assert player_row == (25, HERO_CLS.cid)
+        assert [row[:3] for row in hero_rows] == [(HERO_CLS.cid, 4, 60)]
+        if packed:
+            monkeypatch.setattr(
+                hw.database, '_skill_layouts', backend.fetch_skill_layouts())
+            assert hw.database.unpack_hero_skills(hero_rows[0][3]) == {
+                SKILL_CIDS[0]: 3, SKILL_CIDS[1]: 0}
+        else:
+            assert skill_rows == [(HERO_CLS.cid, SKILL_CIDS[0], 3)]
+    finally:
+        backend.close()
@@ -0,0 +1,31 @@
+"""Tests of resolving heroes' levels from the exp table."""
+
+import benchutil
+
+from hw.configs import exp_algorithm
+
+
+HERO_CLS, = benchutil.make_catalog(1, 2)
+
+
+def level_up(level, exp):
+    """Levels up one level at a time, as heroes did before the exp table."""
+
+    while exp >= exp_algorithm(level):
+        exp -= exp_algorithm(level)
+        level += 1
+    return level, exp
+
+
+def test_levels_match_leveling_up_one_at_a_time():
+    for level in (0, 1, 7):
+        for gained in (0, 1, 99, 100, 119, 120, 5000, 12345):
+            hero = HERO_CLS(level, 10)
+            hero.exp += gained
+            assert (hero.level, hero.exp) == level_up(level, 10 + gained)
+
+
+def test_exp_is_capped_at_max_level():
+    hero = HERO_CLS(HERO_CLS.max_level - 1)
+    hero.exp += 10 ** 7
+    assert (hero.level, hero.exp) == (HERO_CLS.max_level, 0)
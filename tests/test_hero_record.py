@@ -0,0 +1,26 @@
+"""Tests of materializing HeroRecords into Hero objects."""
+
+import benchutil
+
+from hw.entities import HeroRecord
+
+
+HERO_CLS, = benchutil.make_catalog(1, 2)
+
+
+def test_starting_hero_stays_dirty():
+    hero = HeroRecord(HERO_CLS.cid).materialize()
+    assert hero.dirty
+
+
+def test_loaded_hero_is_clean():
+    record = HeroRecord(HERO_CLS.cid, 3, 10, (1, 2), persisted=True)
+    hero = record.materialize()
+    assert not hero.dirty
+    assert (hero.level, hero.exp) == (3, 10)
+    assert [skill.level for skill in hero.skills] == [1, 2]
+
+
+def test_record_of_a_saved_hero_is_persisted():
+    hero = HERO_CLS(4)
+    assert HeroRecord.from_hero(hero).persisted
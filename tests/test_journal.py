@@ -0,0 +1,76 @@
+"""Tests of the reward journal's crash recovery."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import benchutil
+
+from hw.backends import SQLiteBackend
+import hw.database
+
+
+HERO_CLS, = benchutil.make_catalog(1, 2)
+
+
+@pytest.fixture
+def backend(tmpdir, monkeypatch):
+    """SQLite backend with a player who has 10 gold and 50 exp."""
+
+    backend = SQLiteBackend(str(tmpdir.join('hw.db')), 'default', False)
+    backend.setup()
+    backend.write_rows(
+        [('SAVED', 10, HERO_CLS.cid, None, 'SAVED')],
+        [('SAVED', HERO_CLS.cid, 0, 50)],
+        []
+    )
+    monkeypatch.setattr(hw.database, 'backend', backend)
+    monkeypatch.setattr(hw.database, '_queued_players', {})
+    monkeypatch.setattr(hw.database, '_queued_heroes', {})
+    monkeypatch.setattr(hw.database, '_queued_skills', {})
+    monkeypatch.setattr(hw.database, '_queued_journal', [])
+    monkeypatch.setattr(hw.database, '_queued_trims', {})
+    monkeypatch.setattr(
+        hw.database, '_journal_seq', backend.fetch_journal_seq())
+    yield backend
+    backend.close()
+
+
+def totals(backend, steamid):
+    """Gets player's gold and his hero's exp from the database."""
+
+    player_row, hero_rows, _ = backend.fetch_player_rows(steamid)
+    return player_row[0], hero_rows[0][2]
+
+
+def test_journaled_rewards_survive_a_crash(backend):
+    for steamid in ('SAVED', 'NEW'):
+        hw.database.journal_exp(steamid, HERO_CLS.cid, 20)
+        hw.database.journal_gold(steamid, 3)
+        hw.database.journal_gold(steamid, 2)
+
+    # Only the journal gets written, the players are never saved
+    hw.database.flush()
+    assert totals(backend, 'SAVED') == (10, 50)
+
+    assert hw.database.compact_journal() == 6
+    assert totals(backend, 'SAVED') == (15, 70)
+    assert totals(backend, 'NEW') == (5, 20)
+    assert hw.database.compact_journal() == 0
+
+
+def test_saved_rows_trim_their_journal_entries(backend):
+    hw.database.journal_exp('SAVED', HERO_CLS.cid, 20)
+    hw.database.journal_gold('SAVED', 5)
+    hw.database.flush()
+
+    # The saved rows already include the journaled rewards
+    player = SimpleNamespace(
+        steamid='SAVED', name='SAVED', gold=15, hero=HERO_CLS(exp=70),
+        dirty=True)
+    hw.database.save_player_data(player)
+    hw.database.journal_gold('SAVED', 1)
+    hw.database.flush()
+
+    assert hw.database.compact_journal() == 1
+    assert totals(backend, 'SAVED') == (16, 70)
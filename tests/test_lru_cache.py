@@ -0,0 +1,52 @@
+"""Tests of the LRUCache used for reconnecting players."""
+
+from hw.tools import LRUCache
+import hw.tools
+
+
+class Clock(object):
+    """Stand-in for time.monotonic() moved forward by the tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hw.tools, 'time', clock)
+    cache = LRUCache(4, ttl=60)
+    cache.put('STEAM_0:0:1', 'data')
+
+    clock.now += 60
+    assert 'STEAM_0:0:1' in cache
+    clock.now += 1
+    assert 'STEAM_0:0:1' not in cache
+    assert cache.pop('STEAM_0:0:1') is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_put_refreshes_the_entry(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hw.tools, 'time', clock)
+    cache = LRUCache(2, ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    clock.now += 50
+    cache.put('a', 3)
+    cache.put('c', 4)
+
+    clock.now += 50
+    assert cache.keys() == ['a', 'c']
+    assert cache.pop('a') == 3
+
+
+def test_entries_never_expire_without_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hw.tools, 'time', clock)
+    cache = LRUCache(1)
+    cache.put('a', 1)
+    clock.now += 10 ** 9
+    assert cache.pop('a') == 1
@@ -0,0 +1,46 @@
+"""Tests of skill levels packed into the heroes table."""
+
+import pytest
+
+from hw.backends import SQLiteBackend
+from hw.backends import pack_skill_levels
+from hw.backends import skill_layout_id
+from hw.backends import unpack_skill_levels
+import hw.database
+
+
+OLD_LAYOUT = ('Heal', 'Blink', 'Smite')
+NEW_LAYOUT = ('Smite', 'Aura', 'Heal')
+
+
+@pytest.fixture
+def backend(tmpdir, monkeypatch):
+    """Packed SQLite backend with the old layout stored."""
+
+    backend = SQLiteBackend(str(tmpdir.join('hw.db')), 'default', True)
+    backend.setup()
+    backend.pack_skills({'Paladin': OLD_LAYOUT})
+    monkeypatch.setattr(hw.database, 'backend', backend)
+    monkeypatch.setattr(
+        hw.database, '_skill_layouts', backend.fetch_skill_layouts())
+    yield backend
+    backend.close()
+
+
+def test_levels_round_trip():
+    layout_id = skill_layout_id(OLD_LAYOUT)
+    for levels in ((1, 2, 3), (1, 300, 3)):
+        packed = pack_skill_levels(levels, layout_id)
+        assert unpack_skill_levels(packed) == (layout_id, levels)
+    assert unpack_skill_levels(None) == (None, ())
+
+
+def test_levels_follow_their_skills_when_the_layout_changes(backend):
+    packed = pack_skill_levels((1, 2, 3), skill_layout_id(OLD_LAYOUT))
+    levels = hw.database.unpack_hero_skills(packed)
+    assert [levels.get(cid, 0) for cid in NEW_LAYOUT] == [3, 0, 1]
+
+
+def test_unknown_layout_resets_the_skills(backend):
+    packed = pack_skill_levels((1, 2, 3), skill_layout_id(NEW_LAYOUT))
+    assert hw.database.unpack_hero_skills(packed) == {}
@@ -0,0 +1,82 @@
+"""Compares Hero.execute_skills() with the original skill loop.
+
+Simulates a storm of player_hurt events between 64 players: each event
+runs the attacker's player_attack and the defender's player_defend
+skills, like hw.gameevents does. The original execute_skills() called
+every passive's, leveled skill's and item's execute_method(), which
+looked the method up with getattr() on each call; the current one
+reuses the hero's dispatch table.
+
+    python tools/bench_dispatch.py [--players N] [--events N]
+"""
+
+import benchutil
+
+import argparse
+import random
+import time
+
+from hw.entities import Hero
+
+
+def execute_skills_original(hero, method_name, **eargs):
+    """Executes hero's skills like the original execute_skills() did."""
+
+    for passive in hero.passives:
+        passive.execute_method(method_name, **eargs)
+    for skill in hero.skills:
+        if skill.level:
+            skill.execute_method(method_name, **eargs)
+    for item in hero.items:
+        item.execute_method(method_name, **eargs)
+
+
+def storm(heroes, events, execute):
+    """Runs player_hurt events between random heroes.
+
+    Returns:
+        Seconds taken
+    """
+
+    rng = random.Random(1)
+    pairs = [tuple(rng.sample(heroes, 2)) for _ in range(events)]
+    start = time.perf_counter()
+    for attacker, defender in pairs:
+        eargs = {'attacker': attacker, 'defender': defender, 'damage': 10}
+        execute(attacker, 'player_attack', **eargs)
+        execute(defender, 'player_defend', **eargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--players', type=int, default=64)
+    parser.add_argument('--heroes', type=int, default=16)
+    parser.add_argument('--skills', type=int, default=6)
+    parser.add_argument('--passives', type=int, default=2)
+    parser.add_argument('--events', type=int, default=200000)
+    args = parser.parse_args()
+
+    catalog = benchutil.make_catalog(args.heroes, args.skills, args.passives)
+    heroes = []
+    for i in range(args.players):
+        hero = catalog[i % len(catalog)]()
+        for skill in hero.skills:
+            skill.level = 1
+        heroes.append(hero)
+
+    original = storm(heroes, args.events, execute_skills_original)
+    for hero in heroes:
+        hero.clear_dispatch()
+    dispatched = storm(heroes, args.events, Hero.execute_skills)
+
+    print('{0} players, {1} skills and {2} passives per hero'.format(
+        args.players, args.skills, args.passives))
+    print('{0:<10} {1:>12} {2:>12}'.format('loop', 'events/s', 'us/event'))
+    for name, seconds in (('original', original), ('dispatch', dispatched)):
+        print('{0:<10} {1:>12.0f} {2:>12.2f}'.format(
+            name, args.events / seconds, seconds / args.events * 1e6))
+
+
+if __name__ == '__main__':
+    main()
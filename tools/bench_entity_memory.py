@@ -0,0 +1,89 @@
+"""Measures the memory of entity objects with and without __slots__.
+
+Builds 64 online players who own every hero of a generated catalog as
+Hero objects, and offline players in the reconnect cache who own them
+as one current Hero and HeroRecords. This is done once with catalog
+classes declaring an empty __slots__ and once with classes keeping
+their __dict__, like heroes which haven't opted in. The memory is
+measured with tracemalloc.
+
+    python tools/bench_entity_memory.py [--offline N] [--heroes N]
+"""
+
+import benchutil
+
+import argparse
+import tracemalloc
+
+from hw.entities import HeroRecord
+from hw.player import PlayerState
+
+
+def build_players(catalog, online, offline, skills):
+    """Creates the players' data.
+
+    Returns:
+        List of the players' PlayerStates
+    """
+
+    def level(hero):
+        hero.level = 10
+        for skill in hero.skills:
+            skill.level = 1
+        return hero
+
+    players = []
+    for i in range(online + offline):
+        state = PlayerState(benchutil.steamid(0))
+        if i < online:
+            state.heroes = [level(hero_cls()) for hero_cls in catalog]
+        else:
+            state.heroes = [level(catalog[0]())] + [
+                HeroRecord(hero_cls.cid, 10, 0, (1, ) * skills, True)
+                for hero_cls in catalog[1:]
+            ]
+        state.hero = state.heroes[0]
+        players.append(state)
+    return players
+
+
+def allocated(fn):
+    """Measures the memory allocated by a function's return value.
+
+    Returns:
+        Bytes allocated
+    """
+
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    result = fn()
+    stats = tracemalloc.take_snapshot().compare_to(start, 'filename')
+    tracemalloc.stop()
+    del result
+    return sum(stat.size_diff for stat in stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--online', type=int, default=64)
+    parser.add_argument('--offline', type=int, default=10000)
+    parser.add_argument('--heroes', type=int, default=40)
+    parser.add_argument('--skills', type=int, default=6)
+    args = parser.parse_args()
+
+    print('{0} heroes x {1} skills, {2} online and {3} offline players'
+          .format(args.heroes, args.skills, args.online, args.offline))
+    print('{0:<10} {1:>10} {2:>10} {3:>10}'.format(
+        'classes', 'online MB', 'offline MB', 'total MB'))
+    for name, slots in (('__dict__', False), ('__slots__', True)):
+        catalog = benchutil.make_catalog(args.heroes, args.skills, 1, slots)
+        online = allocated(lambda: build_players(
+            catalog, args.online, 0, args.skills))
+        offline = allocated(lambda: build_players(
+            catalog, 0, args.offline, args.skills))
+        print('{0:<10} {1:>10.1f} {2:>10.1f} {3:>10.1f}'.format(
+            name, online / 1e6, offline / 1e6, (online + offline) / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Compares the memory of players' heroes with and without HeroRecords.
+
+Loads players who own every hero of a generated catalog from their
+database rows with hw.database._build_player_data(), which keeps only
+the current hero as a Hero object and the others as HeroRecords, and
+materializes all of the records like every owned hero used to be
+created. The memory is measured with tracemalloc.
+
+    python tools/bench_hero_records.py [--players N] [--heroes N]
+"""
+
+import benchutil
+
+import argparse
+import tracemalloc
+
+import hw.database
+from hw.entities import HeroRecord
+
+
+class FakePlayer(object):
+    """Holds the attributes _build_player_data() sets."""
+
+    def __init__(self):
+        self.gold = 0
+        self.hero = None
+        self.heroes = []
+        self.dirty = False
+
+
+def load_players(players, heroes, skills, materialize):
+    """Builds players' data from generated rows.
+
+    Returns:
+        Average bytes allocated per player
+    """
+
+    rows = []
+    for player_rows, hero_rows, skill_rows in benchutil.seed_rows(
+            players, heroes, skills):
+        for player_row in player_rows:
+            sid = player_row[0]
+            rows.append((
+                player_row[1:3],
+                [row[1:] + (None, ) for row in hero_rows if row[0] == sid],
+                [row[1:] for row in skill_rows if row[0] == sid]
+            ))
+
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    loaded = []
+    for player_row, hero_rows, skill_rows in rows:
+        player = FakePlayer()
+        hw.database._build_player_data(
+            player, player_row, hero_rows, skill_rows)
+        if materialize:
+            player.heroes = [
+                hero.materialize() if isinstance(hero, HeroRecord) else hero
+                for hero in player.heroes
+            ]
+        loaded.append(player)
+    stats = tracemalloc.take_snapshot().compare_to(start, 'filename')
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in stats) / players
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--players', type=int, default=500)
+    parser.add_argument('--heroes', type=int, nargs='+', default=[10, 40])
+    parser.add_argument('--skills', type=int, default=6)
+    args = parser.parse_args()
+
+    benchutil.make_catalog(max(args.heroes), args.skills)
+
+    print('{0} players, {1} skills per hero'.format(
+        args.players, args.skills))
+    print('{0:<8} {1:>14} {2:>14}'.format(
+        'heroes', 'objects KB', 'records KB'))
+    for heroes in args.heroes:
+        objects = load_players(args.players, heroes, args.skills, True)
+        records = load_players(args.players, heroes, args.skills, False)
+        print('{0:<8} {1:>14.1f} {2:>14.1f}'.format(
+            heroes, objects / 1024, records / 1024))
+
+
+if __name__ == '__main__':
+    main()
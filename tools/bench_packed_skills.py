@@ -0,0 +1,83 @@
+"""Compares the skills table with skill levels packed into the heroes.
+
+Seeds a temporary database with one row per skill, measures its file
+size and load latency, converts it with pack_skills() like
+hw.database.setup() does, vacuums it and measures again.
+
+    python tools/bench_packed_skills.py [--players N] [--heroes N]
+"""
+
+import benchutil
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from hw.backends import SQLiteBackend
+
+
+def compact_size(backend, path):
+    """Vacuums the database and gets its checkpointed file size."""
+
+    backend.vacuum()
+    with backend._write() as statements:
+        statements.fetchall('PRAGMA wal_checkpoint(TRUNCATE)')
+    return benchutil.file_size(path)
+
+
+def load_latency(backend, players, loads):
+    """Measures the average fetch_player_rows() time of random players."""
+
+    rng = random.Random(1)
+    steamids = [
+        benchutil.steamid(rng.randrange(players)) for _ in range(loads)]
+    for steamid in steamids:
+        backend.fetch_player_rows(steamid)
+    ids = iter(steamids)
+    return benchutil.measure(
+        lambda: backend.fetch_player_rows(next(ids)), loads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--players', type=int, default=20000)
+    parser.add_argument('--heroes', type=int, default=10)
+    parser.add_argument('--skills', type=int, default=6)
+    parser.add_argument('--loads', type=int, default=2000)
+    args = parser.parse_args()
+
+    catalog = benchutil.make_catalog(args.heroes, args.skills)
+
+    with tempfile.TemporaryDirectory(prefix='hw_bench_') as directory:
+        path = os.path.join(directory, 'hw.db')
+        backend = SQLiteBackend(path, 'default', False)
+        benchutil.seed_database(
+            backend, args.players, args.heroes, args.skills)
+        rows_size = compact_size(backend, path)
+        rows_latency = load_latency(backend, args.players, args.loads)
+
+        start = time.perf_counter()
+        converted = backend.pack_skills(benchutil.skill_layouts(catalog))
+        migration_time = time.perf_counter() - start
+        backend.close()
+
+        backend = SQLiteBackend(path, 'default', True)
+        packed_size = compact_size(backend, path)
+        packed_latency = load_latency(backend, args.players, args.loads)
+        backend.close()
+
+    print('{0} players x {1} heroes x {2} skills'.format(
+        args.players, args.heroes, args.skills))
+    print('{0:<8} {1:>10} {2:>10}'.format('schema', 'MB', 'ms/load'))
+    print('{0:<8} {1:>10.1f} {2:>10.3f}'.format(
+        'rows', rows_size / 1e6, rows_latency * 1000))
+    print('{0:<8} {1:>10.1f} {2:>10.3f}'.format(
+        'packed', packed_size / 1e6, packed_latency * 1000))
+    print('pack_skills() converted {0} heroes in {1:.1f} s'.format(
+        converted, migration_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Compares the per-hero and the bulk loading of a player's rows.
+
+Seeds a temporary SQLite database, then loads veteran players with the
+original query pattern (one query for the player, one for his heroes,
+then one per hero and one per skill) and with
+SQLiteBackend.fetch_player_rows() plus hw.database._build_player_data().
+
+    python tools/bench_player_load.py [--players N] [--heroes N]
+"""
+
+import benchutil
+
+import argparse
+import os
+import sqlite3
+import tempfile
+
+from hw.backends import SQLiteBackend
+import hw.database
+
+
+class FakePlayer(object):
+    """Holds the attributes _build_player_data() sets."""
+
+    def __init__(self, steamid):
+        self.steamid = steamid
+        self.gold = 0
+        self.hero = None
+        self.heroes = []
+        self.dirty = False
+
+
+def load_per_hero(connection, heroes_by_cid, steamid):
+    """Loads a player like the original load_player_data() did."""
+
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT gold, hero_cid FROM players WHERE steamid=?", (steamid, ))
+    gold, current_hero_cid = cursor.fetchone() or (0, None)
+    cursor.execute(
+        "SELECT cid, level, exp FROM heroes WHERE steamid=?", (steamid, ))
+    player = FakePlayer(steamid)
+    player.gold = gold
+    for cid, level, exp in cursor.fetchall():
+        hero_cls = heroes_by_cid.get(cid)
+        if hero_cls is None:
+            continue
+        hero = hero_cls()
+        cursor.execute(
+            "SELECT level, exp FROM heroes WHERE steamid=? AND cid=?",
+            (steamid, cid))
+        hero.level, hero.exp = cursor.fetchone() or (0, 0)
+        for skill in hero.skills:
+            cursor.execute(
+                "SELECT level FROM skills "
+                "WHERE steamid=? AND hero_cid=? AND cid=?",
+                (steamid, cid, skill.cid))
+            row = cursor.fetchone()
+            if row:
+                skill.level = row[0]
+        player.heroes.append(hero)
+        if cid == current_hero_cid:
+            player.hero = hero
+    cursor.close()
+    return player
+
+
+def load_bulk(backend, steamid):
+    """Loads a player with the current bulk loader."""
+
+    player = FakePlayer(steamid)
+    hw.database._build_player_data(
+        player, *backend.fetch_player_rows(steamid))
+    return player
+
+
+def count_queries(connection, fn):
+    """Counts the statements a function executes on a connection."""
+
+    statements = []
+    connection.set_trace_callback(statements.append)
+    fn()
+    connection.set_trace_callback(None)
+    return len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--heroes', type=int, default=40)
+    parser.add_argument('--skills', type=int, default=6)
+    parser.add_argument('--loads', type=int, default=200)
+    args = parser.parse_args()
+
+    catalog = benchutil.make_catalog(args.heroes, args.skills)
+    heroes_by_cid = {hero_cls.cid: hero_cls for hero_cls in catalog}
+
+    with tempfile.TemporaryDirectory(prefix='hw_bench_') as directory:
+        path = os.path.join(directory, 'hw.db')
+        backend = SQLiteBackend(path, 'default', False)
+        benchutil.seed_database(
+            backend, args.players, args.heroes, args.skills)
+        print('Seeded {0} players x {1} heroes x {2} skills, {3:.1f} MB'
+              .format(args.players, args.heroes, args.skills,
+                      benchutil.file_size(path) / 1e6))
+
+        connection = sqlite3.connect(path)
+        steamids = [
+            benchutil.steamid(i * args.players // args.loads)
+            for i in range(args.loads)
+        ]
+
+        # Warm the page cache and the readers' connections
+        for steamid in steamids:
+            load_per_hero(connection, heroes_by_cid, steamid)
+            load_bulk(backend, steamid)
+        reader = backend._local.statements.connection
+
+        old_queries = count_queries(
+            connection,
+            lambda: load_per_hero(connection, heroes_by_cid, steamids[0]))
+        new_queries = count_queries(
+            reader, lambda: load_bulk(backend, steamids[0]))
+
+        ids = iter(steamids * 2)
+        old_time = benchutil.measure(
+            lambda: load_per_hero(connection, heroes_by_cid, next(ids)),
+            len(steamids))
+        ids = iter(steamids * 2)
+        new_time = benchutil.measure(
+            lambda: load_bulk(backend, next(ids)), len(steamids))
+
+        connection.close()
+        backend.close()
+
+    print('{0:<10} {1:>8} {2:>12}'.format('loader', 'queries', 'ms/player'))
+    print('{0:<10} {1:>8} {2:>12.3f}'.format(
+        'per hero', old_queries, old_time * 1000))
+    print('{0:<10} {1:>8} {2:>12.3f}'.format(
+        'bulk', new_queries, new_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Compares the old dict-of-dicts player data with PlayerState objects.
+
+The old Player properties looked the data up with
+_player_data[self.userid]['gold'] on every access, the current ones
+read self._state.gold. Both are timed on stand-in players whose userid
+is a plain Python property; on a server it's a call into the engine,
+so the old numbers are a lower bound. The memory of one player's data
+is measured with tracemalloc, without the heroes and the steamid.
+
+    python tools/bench_player_state.py [--players N] [--number N]
+"""
+
+import benchutil
+
+import argparse
+import sys
+import timeit
+import tracemalloc
+
+import hw.player
+from hw.player import PlayerState
+
+
+# The steamid strings exist either way, so one is shared by all
+STEAMID = benchutil.steamid(0)
+
+_old_player_data = {}
+
+
+class OldPlayer(object):
+    """Player whose properties look up the old data dicts."""
+
+    def __init__(self, userid):
+        self._userid = userid
+
+    @property
+    def userid(self):
+        return self._userid
+
+    @property
+    def gold(self):
+        return _old_player_data[self.userid]['gold']
+
+    @property
+    def hero(self):
+        return _old_player_data[self.userid]['hero']
+
+    @property
+    def dirty(self):
+        return _old_player_data[self.userid]['dirty']
+
+
+class NewPlayer(object):
+    """Player with the properties of hw.player.Player."""
+
+    gold = hw.player.Player.gold
+    hero = hw.player.Player.hero
+    dirty = hw.player.Player.dirty
+
+    def __init__(self, state):
+        self._state = state
+
+
+def old_data():
+    """Creates a player's data like the old Player.__init__ did."""
+
+    return {
+        'gold': 0,
+        'hero': None,
+        'heroes': [],
+        'restrictions': set(),
+        'dirty': True
+    }
+
+
+def allocated(factory, players):
+    """Measures the memory allocated per object of a factory.
+
+    Returns:
+        Average bytes per object
+    """
+
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(players)]
+    stats = tracemalloc.take_snapshot().compare_to(start, 'filename')
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in stats) - sys.getsizeof(objects)
+    return size / players
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--number', type=int, default=1000000)
+    args = parser.parse_args()
+
+    old_player = OldPlayer(2)
+    _old_player_data[2] = old_data()
+    new_player = NewPlayer(PlayerState(STEAMID))
+
+    print('{0:<14} {1:>12} {2:>12}'.format('access', 'old ns', 'new ns'))
+    for attribute in ('gold', 'hero', 'dirty'):
+        statement = 'player.' + attribute
+        old_time, new_time = (
+            min(timeit.repeat(
+                statement, globals={'player': player},
+                number=args.number, repeat=5)) / args.number
+            for player in (old_player, new_player)
+        )
+        print('{0:<14} {1:>12.1f} {2:>12.1f}'.format(
+            statement, old_time * 1e9, new_time * 1e9))
+
+    old_size = allocated(lambda i: old_data(), args.players)
+    new_size = allocated(lambda i: PlayerState(STEAMID), args.players)
+    print('{0:<14} {1:>12.0f} {2:>12.0f}'.format(
+        'bytes/player', old_size, new_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Compares save and load throughput of the SQLite connection profiles.
+
+Seeds a temporary database once, then for each profile in
+hw.configs.database_profiles runs, on a fresh copy of it:
+
+- saves: write_rows() transactions of --batch players' rows, like the
+  background writer's flushes
+- loads: fetch_player_rows() of random players
+
+    python tools/bench_profiles.py [--players N] [--seconds S]
+"""
+
+import benchutil
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from hw.backends import SQLiteBackend
+from hw.configs import database_profiles
+
+
+def run_for(seconds, fn):
+    """Calls a function repeatedly for a while.
+
+    Returns:
+        Calls per second
+    """
+
+    calls = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        fn()
+        calls += 1
+    return calls / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--heroes', type=int, default=1)
+    parser.add_argument('--skills', type=int, default=6)
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    benchutil.make_catalog(args.heroes, args.skills)
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory(prefix='hw_bench_') as directory:
+        seed_path = os.path.join(directory, 'seed.db')
+        backend = SQLiteBackend(seed_path, 'fast', False)
+        benchutil.seed_database(
+            backend, args.players, args.heroes, args.skills)
+        backend.close()
+        print('Seeded {0} players x {1} heroes x {2} skills, {3:.1f} MB'
+              .format(args.players, args.heroes, args.skills,
+                      benchutil.file_size(seed_path) / 1e6))
+
+        print('{0:<8} {1:>12} {2:>12} {3:>12}'.format(
+            'profile', 'saves/s', 'players/s', 'loads/s'))
+        for profile in database_profiles:
+            path = os.path.join(directory, profile + '.db')
+            shutil.copy(seed_path, path)
+            backend = SQLiteBackend(path, profile, False)
+            backend.setup()
+
+            def save():
+                backend.write_rows(*next(benchutil.seed_rows(
+                    args.batch, args.heroes, args.skills,
+                    first=rng.randrange(args.players - args.batch))))
+
+            def load():
+                backend.fetch_player_rows(
+                    benchutil.steamid(rng.randrange(args.players)))
+
+            saves = run_for(args.seconds, save)
+            loads = run_for(args.seconds, load)
+            backend.close()
+            os.remove(path)
+            print('{0:<8} {1:>12.0f} {2:>12.0f} {3:>12.0f}'.format(
+                profile, saves, saves * args.batch, loads))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Compares hw.signals with the engine events they replaced.
+
+A level up used to fire Hero_Pre_Level_Up, whose listener found the
+hero's owner by looping over the players with PlayerIter() and fired
+Hero_Level_Up, whose listener looked the player up by his index. Now
+Hero._fire_level_up() emits hw.signals.hero_level_up with the objects.
+
+The engine path is emulated in Python: events are dicts of strings and
+ints dispatched by name, and players are looked up from a dict of 64
+players. A real game event is created and fired in C++ and wrapped for
+each Python listener, so the engine numbers are a lower bound.
+
+    python tools/bench_signals.py [--players N] [--number N]
+"""
+
+import benchutil  # noqa: F401  (makes hw importable)
+
+import argparse
+import random
+import timeit
+
+from hw.signals import Signal
+
+
+class GameEvent(object):
+    """Game event with its variables converted like the engine does."""
+
+    def __init__(self, name, variables):
+        self.name = name
+        self._variables = {
+            key: value if isinstance(value, int) else str(value)
+            for key, value in variables.items()
+        }
+
+    def get_int(self, key):
+        return int(self._variables.get(key, 0))
+
+    def get_string(self, key):
+        return str(self._variables.get(key, ''))
+
+
+class Engine(object):
+    """Dispatches the game events to their listeners by name."""
+
+    def __init__(self):
+        self.listeners = {}
+
+    def register(self, name, callback):
+        self.listeners.setdefault(name, []).append(callback)
+
+    def fire(self, name, **variables):
+        event = GameEvent(name, variables)
+        for callback in self.listeners.get(name, ()):
+            callback(event)
+
+
+class FakePlayer(object):
+    """Player with an index, a userid and a hero."""
+
+    def __init__(self, index):
+        self.index = index
+        self.userid = index + 100
+        self.hero = object()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--players', type=int, default=64)
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args()
+
+    players = {index: FakePlayer(index)
+               for index in range(1, args.players + 1)}
+    rng = random.Random(1)
+    levelers = [players[rng.randint(1, args.players)]
+                for _ in range(args.number)]
+    handled = []
+
+    # The original path through two engine events
+    engine = Engine()
+
+    def hero_pre_level_up(game_event):
+        hero_id = int(game_event.get_string('id'))
+        for index in players:
+            player = players[index]
+            if id(player.hero) == hero_id:
+                engine.fire(
+                    'hero_level_up', cid='Hero', id=str(hero_id),
+                    player_index=player.index, player_userid=player.userid)
+                break
+
+    def hero_level_up(game_event):
+        player = players[game_event.get_int('player_index')]
+        handled.append((player, player.hero))
+
+    engine.register('hero_pre_level_up', hero_pre_level_up)
+    engine.register('hero_level_up', hero_level_up)
+
+    def fire_engine():
+        player = next(leveling)
+        engine.fire('hero_pre_level_up', cid='Hero', id=str(id(player.hero)))
+
+    # The signal, without engine listeners so nothing gets mirrored
+    signal = Signal('hero_level_up', ('player', 'hero'))
+    signal.connect(lambda player, hero: handled.append((player, hero)))
+
+    def emit_signal():
+        player = next(leveling)
+        signal.emit(player=player, hero=player.hero)
+
+    print('{0} players'.format(args.players))
+    print('{0:<10} {1:>12}'.format('path', 'us/level up'))
+    for name, fn in (('engine', fire_engine), ('signal', emit_signal)):
+        leveling = iter(levelers)
+        seconds = timeit.timeit(fn, number=args.number)
+        print('{0:<10} {1:>12.2f}'.format(name, seconds / args.number * 1e6))
+    assert len(handled) == 2 * args.number
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Shared helpers of the standalone benchmark scripts."""
+
+import standalone  # noqa: F401  (makes hw importable)
+
+import os
+import time
+
+
+# Skill methods given to the generated skills, in turns
+SKILL_METHODS = (
+    'player_attack', 'player_defend', 'player_spawn', 'player_kill',
+    'player_death', 'player_jump', 'round_start', 'player_ultimate'
+)
+
+
+def make_catalog(hero_count, skill_count=6, passive_count=1, slots=True):
+    """Defines a catalog of hero classes for benchmarks.
+
+    Skill i of each hero implements SKILL_METHODS[i % 8], passives
+    implement player_spawn.
+
+    Args:
+        hero_count: Amount of hero classes
+        skill_count: Amount of skills per hero
+        passive_count: Amount of passives per hero
+        slots: Declare an empty __slots__ in the classes
+
+    Returns:
+        List of the hero classes
+    """
+
+    from hw.entities import Hero
+    from hw.entities import Skill
+
+    def method(self, **eargs):
+        pass
+
+    extra = {'__slots__': ()} if slots else {}
+
+    heroes = []
+    for h in range(hero_count):
+        hero_cls = type('BenchHero{0}'.format(h), (Hero, ), dict({
+            'name': 'Bench Hero {0}'.format(h),
+            'description': 'Hero generated for benchmarks.',
+            'max_level': 50
+        }, **extra))
+        for s in range(skill_count):
+            hero_cls.skill(type(
+                'BenchSkill{0}x{1}'.format(h, s), (Skill, ), dict({
+                    'name': 'Bench Skill {0}'.format(s),
+                    SKILL_METHODS[s % len(SKILL_METHODS)]: method
+                }, **extra)))
+        for p in range(passive_count):
+            hero_cls.passive(type(
+                'BenchPassive{0}x{1}'.format(h, p), (Skill, ),
+                dict({'player_spawn': method}, **extra)))
+        heroes.append(hero_cls)
+    return heroes
+
+
+def skill_layouts(heroes):
+    """Gets the skill cid tuples of hero classes keyed by hero cid."""
+
+    return {
+        hero_cls.cid: tuple(skill.cid for skill in hero_cls.skill_set)
+        for hero_cls in heroes
+    }
+
+
+def seed_rows(players, heroes, skills, packed=False, chunk=200, first=0):
+    """Generates rows of a seeded database in chunks.
+
+    Player i owns heroes 0 .. heroes-1 at level i % 50, with every
+    skill at level 1 + (i % 6). The players are numbered from first.
+
+    Yields:
+        (players, heroes, skills) row lists of write_rows()
+    """
+
+    from hw.backends import pack_skill_levels
+    from hw.backends import skill_layout_id
+
+    now = int(time.time())
+    for start in range(first, first + players, chunk):
+        player_rows, hero_rows, skill_rows = [], [], []
+        for i in range(start, min(start + chunk, first + players)):
+            sid = steamid(i)
+            player_rows.append(
+                (sid, i * 10, 'BenchHero0', now, 'Player {0}'.format(i)))
+            for h in range(heroes):
+                cid = 'BenchHero{0}'.format(h)
+                levels = [1 + i % 6] * skills
+                if packed:
+                    hero_rows.append((
+                        sid, cid, i % 50, i, pack_skill_levels(
+                            levels, skill_layout_id(layout(h, skills)))))
+                    continue
+                hero_rows.append((sid, cid, i % 50, i))
+                skill_rows.extend(
+                    (sid, cid, skill_cid, level)
+                    for skill_cid, level in zip(layout(h, skills), levels))
+        yield player_rows, hero_rows, skill_rows
+
+
+def seed_database(backend, players, heroes, skills):
+    """Fills a backend's database with generated players."""
+
+    backend.setup()
+    if backend.packed:
+        backend.write_skill_layouts(
+            layout(h, skills) for h in range(heroes))
+    for rows in seed_rows(players, heroes, skills, backend.packed):
+        backend.write_rows(*rows)
+
+
+def layout(hero, skills):
+    """Gets the skill cids of the hero-th catalog hero."""
+
+    return tuple(
+        'BenchSkill{0}x{1}'.format(hero, s) for s in range(skills))
+
+
+def steamid(i):
+    """Gets the steamid of the i:th seeded player."""
+
+    return 'STEAM_0:{0}:{1}'.format(i % 2, 1000000 + i)
+
+
+def file_size(path):
+    """Gets the size of a database file and its WAL file in bytes."""
+
+    return sum(
+        os.path.getsize(p) for p in (path, path + '-wal')
+        if os.path.exists(p))
+
+
+def measure(fn, number):
+    """Runs a function number times.
+
+    Returns:
+        Average seconds per call
+    """
+
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number
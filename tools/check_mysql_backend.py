@@ -0,0 +1,120 @@
+"""Runs the mysql backend against a local MySQL or MariaDB server.
+
+Exercises MySQLBackend's setup(), write_rows(), fetch_player_rows(),
+compact_journal() and pack_skills(), so the SQLite to MySQL statement
+translation and the SUM() Decimal conversions actually get executed.
+Start a throwaway server with tools/mysql/docker-compose.yml first.
+All of Hero-Wars' tables in the database are dropped, so never point
+this at a real database.
+
+    python tools/check_mysql_backend.py [--host H] [--port P] ...
+"""
+
+import benchutil
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from hw.backends import MySQLBackend
+from hw.backends import skill_layout_id
+from hw.backends import unpack_skill_levels
+
+
+# Tables of the database, dropped before the checks
+TABLES = ('players', 'heroes', 'skills', 'journal', 'skill_layouts')
+
+
+def check(condition, message):
+    """Exits with the message if the condition doesn't hold."""
+
+    if not condition:
+        raise SystemExit('FAILED: ' + message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='hw')
+    parser.add_argument('--password', default='hw')
+    parser.add_argument('--database', default='hw')
+    parser.add_argument('--players', type=int, default=300)
+    args = parser.parse_args()
+
+    settings = {
+        'host': args.host,
+        'port': args.port,
+        'user': args.user,
+        'password': args.password,
+        'database': args.database
+    }
+    catalog = benchutil.make_catalog(3, 4)
+    layouts = benchutil.skill_layouts(catalog)
+
+    backend = MySQLBackend(settings, pool_size=4, packed=False)
+    with backend._write() as statements:
+        for table in TABLES:
+            statements.execute('DROP TABLE IF EXISTS ' + table)
+
+    # Creating the tables twice also runs the column and index checks
+    backend.setup()
+    backend.setup()
+    print('setup: ok')
+
+    for rows in benchutil.seed_rows(args.players, 3, 4):
+        backend.write_rows(*rows)
+    steamid = benchutil.steamid(7)
+    player_row, hero_rows, skill_rows = backend.fetch_player_rows(steamid)
+    check(player_row == (70, 'BenchHero0'), 'player row {0}'.format(
+        player_row))
+    check(len(hero_rows) == 3 and len(skill_rows) == 12, 'hero rows')
+    check(all(level == 2 for _, _, level in skill_rows), 'skill levels')
+    print('write_rows, fetch_player_rows: ok')
+
+    with ThreadPoolExecutor(4) as executor:
+        loaded = list(executor.map(
+            backend.fetch_player_rows,
+            [benchutil.steamid(i) for i in range(args.players)]
+        ))
+    check(all(rows[0] is not None for rows in loaded), 'concurrent loads')
+    print('concurrent fetch_player_rows: ok')
+
+    backend.write_rows([], [], [], journal=[
+        (steamid, '', 1, 0, 5),
+        (steamid, '', 2, 0, 6),
+        (steamid, 'BenchHero1', 3, 40, 0),
+        ('STEAM_NEW', '', 4, 0, 9),
+        ('STEAM_NEW', 'BenchHero2', 5, 12, 0)
+    ])
+    check(backend.fetch_journal_seq() == 5, 'journal seq')
+    check(backend.compact_journal() == 5, 'compacted entries')
+    player_row, hero_rows, _ = backend.fetch_player_rows(steamid)
+    check(player_row[0] == 81, 'compacted gold {0}'.format(player_row[0]))
+    check(type(player_row[0]) is int, 'gold type')
+    exp = {cid: exp for cid, level, exp, _ in hero_rows}
+    check(exp['BenchHero1'] == 47, 'compacted exp {0}'.format(exp))
+    new_row, new_heroes, _ = backend.fetch_player_rows('STEAM_NEW')
+    check(new_row[0] == 9 and new_heroes[0][2] == 12, 'missing rows')
+    print('compact_journal: ok')
+
+    converted = backend.pack_skills(layouts, batch_size=50)
+    check(converted == args.players * 3, 'converted {0}'.format(converted))
+    backend.close()
+
+    packed = MySQLBackend(settings, pool_size=2, packed=True)
+    _, hero_rows, skill_rows = packed.fetch_player_rows(steamid)
+    check(not skill_rows, 'skill rows left after packing')
+    check(all(
+        unpack_skill_levels(skills) == (
+            skill_layout_id(layouts[cid]), (2, ) * 4)
+        for cid, _, _, skills in hero_rows
+    ), 'packed skill levels')
+    check(packed.fetch_skill_layouts() == {
+        skill_layout_id(layout): layout for layout in layouts.values()
+    }, 'skill layouts')
+    packed.close()
+    print('pack_skills: ok')
+
+
+if __name__ == '__main__':
+    main()
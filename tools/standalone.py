@@ -0,0 +1,102 @@
+"""Imports Hero-Wars modules outside of a game server.
+
+Importing this module puts the plugin's directory on sys.path so that
+`hw` can be imported. If Source.Python isn't installed, its packages
+are replaced with placeholder modules, whose names resolve to inert
+placeholder objects. That's enough to import Hero-Wars' modules for
+benchmarks and tests of their pure Python parts; nothing that talks to
+the engine works.
+"""
+
+import importlib.abc
+import importlib.machinery
+import os
+import sys
+import types
+
+
+PLUGIN_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'addons', 'source-python', 'plugins'
+)
+
+# Top-level Source.Python packages imported by Hero-Wars
+SOURCE_PYTHON_PACKAGES = (
+    'commands', 'core', 'cvars', 'engines', 'entities', 'events',
+    'filters', 'listeners', 'memory', 'menus', 'messages', 'players',
+    'plugins', 'translations', 'weapons'
+)
+
+
+class Placeholder(object):
+    """Stands in for any Source.Python class, object or function.
+
+    Calling it with a single callable returns the callable, so it also
+    works as a decorator. Any attribute is another placeholder.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return Placeholder()
+
+    def __getattr__(self, name):
+        return Placeholder()
+
+    def __bool__(self):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+
+class _PlaceholderModule(types.ModuleType):
+    """Module whose capitalized names are classes, others objects."""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name[:1].isupper():
+            value = type(name, (Placeholder, ), {})
+        else:
+            value = Placeholder()
+        setattr(self, name, value)
+        return value
+
+
+class _PlaceholderFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Finds placeholder modules for the Source.Python packages."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname.split('.')[0] not in SOURCE_PYTHON_PACKAGES:
+            return None
+        return importlib.machinery.ModuleSpec(
+            fullname, self, is_package=True)
+
+    def create_module(self, spec):
+        module = _PlaceholderModule(spec.name)
+        module.__path__ = []
+        return module
+
+    def exec_module(self, module):
+        pass
+
+
+def _has_source_python():
+    """Checks if the real Source.Python is importable."""
+
+    try:
+        import players.entity  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+if PLUGIN_DIR not in sys.path:
+    sys.path.insert(0, PLUGIN_DIR)
+
+if not _has_source_python():
+    sys.meta_path.append(_PlaceholderFinder())